@@ -0,0 +1,72 @@
+"""
+Comparaison des chemins de sérialisation JSON sur les réponses réelles de l'API.
+
+- actuel : jsonable_encoder + JSONResponse (chemin par défaut de FastAPI)
+- rapide : FastJSONResponse (orjson, ou json standard si orjson est absent)
+
+Utilisation (depuis le dossier backend, magasin binaire construit) :
+    python -m benchmarks.bench_serialization [--data-dir data] [--repeat 200]
+"""
+import argparse
+import time
+from typing import Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from services import fast_json
+from services.csv_data_processing import SEASONS, ClimateDataProcessor
+from services.fast_json import FastJSONResponse
+
+
+def _best_of(fn: Callable[[], bytes], repeat: int) -> float:
+    """Meilleur temps (ms) d'un appel sur `repeat` répétitions"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def build_payloads(processor: ClimateDataProcessor) -> Dict[str, dict]:
+    """Réponses représentatives, sur toute la période disponible"""
+    years = processor.get_available_years()
+    start_year, end_year = min(years), max(years)
+    return {
+        "time-series": processor.get_time_series("tasmax", start_year, end_year),
+        "spatial (records)": processor.get_spatial_data("tasmax", list(SEASONS["JJAS"]), start_year, end_year),
+        "localities/batch": processor.get_localities_time_series(
+            "tasmax", processor.resolve_localities(None, []), start_year, end_year
+        ),
+        "localities": processor.get_available_localities(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de la sérialisation JSON des réponses")
+    parser.add_argument("--data-dir", default="data", help="Dossier data contenant le magasin binaire")
+    parser.add_argument("--repeat", type=int, default=200, help="Nombre de répétitions par mesure")
+    args = parser.parse_args(argv)
+
+    processor = ClimateDataProcessor(args.data_dir)
+    payloads = build_payloads(processor)
+    years = processor.get_available_years()
+    grid = processor.get_spatial_grid("tasmax", list(SEASONS["JJAS"]), min(years), max(years))
+
+    engine = "orjson" if fast_json.orjson is not None else "json (repli)"
+    print(f"Sérialiseur rapide : {engine}, meilleur temps sur {args.repeat} répétitions")
+    print(f"{'réponse':<20} {'octets':>9} {'actuel (ms)':>12} {'rapide (ms)':>12} {'gain':>7}")
+    for name, payload in payloads.items():
+        current = _best_of(lambda: JSONResponse(jsonable_encoder(payload)).body, args.repeat)
+        fast = _best_of(lambda: FastJSONResponse(payload).body, args.repeat)
+        size = len(FastJSONResponse(payload).body)
+        print(f"{name:<20} {size:>9} {current:>12.3f} {fast:>12.3f} {current / fast:>6.1f}x")
+
+    # Grille dense : jsonable_encoder ne sait pas encoder un tableau NumPy
+    fast = _best_of(lambda: FastJSONResponse(grid).body, args.repeat)
+    print(f"{'spatial (grid)':<20} {len(FastJSONResponse(grid).body):>9} {'-':>12} {fast:>12.3f} {'-':>7}")
+
+
+if __name__ == "__main__":
+    main()
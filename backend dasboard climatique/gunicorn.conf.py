@@ -0,0 +1,32 @@
+"""
+Configuration gunicorn de l'API climatique.
+
+L'application est préchargée dans le processus maître (preload_app) : le
+magasin binaire est ouvert (et converti au premier démarrage) une seule fois
+avant le fork, puis tous les workers partagent en lecture seule les mêmes
+pages mémoire mappées. Le nombre de workers suit donc le nombre de cœurs,
+et non plus la RAM disponible.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+preload_app = True
+
+
+def when_ready(server):
+    """Demande au noyau de charger le magasin dans le cache de pages partagé
+
+    Compile aussi le noyau numba des séquences avant le fork : sinon chaque
+    worker paie la compilation à sa première requête /spells.
+    """
+    from routers.climate import processor
+    from services import binary_store, spells
+
+    binary_store.prefetch_store(processor.store_dir)
+    server.log.info("Magasin binaire partagé entre %s workers: %s", server.num_workers, processor.store_dir)
+    if spells.warm_up():
+        server.log.info("Noyau numba des séquences compilé avant le fork")
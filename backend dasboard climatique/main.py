@@ -1,15 +1,34 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import climate
+from middleware import CompressionMiddleware, ConditionalCacheMiddleware, build_identity
+from services.anomalies import DEFAULT_BASELINE
+from services.fast_json import FastJSONResponse
 import uvicorn
 
 # Création de l'application FastAPI
 app = FastAPI(
     title="API Données Climatiques Sénégal",
     description="API pour l'analyse et la visualisation des données climatiques du Sénégal",
-    version="1.0.0",
+    version="1.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse
+)
+
+# Middlewares : le dernier ajouté est le plus extérieur (CORS > cache conditionnel > compression)
+
+# Compression gzip/brotli au-delà de CLIMATE_COMPRESS_MIN_BYTES, corps compressés en cache par ETag
+app.add_middleware(CompressionMiddleware)
+
+# Cache HTTP conditionnel : ETag fort dérivé des versions de l'API, du code et des données,
+# 304 sur If-None-Match (à l'intérieur de CORS pour que les réponses 304 portent aussi les en-têtes CORS).
+# La configuration qui change le contenu des réponses (période de référence par défaut
+# des anomalies et des indices) fait aussi partie de l'identité.
+response_settings = "baseline={}-{}".format(*DEFAULT_BASELINE)
+app.add_middleware(
+    ConditionalCacheMiddleware,
+    version=f"{app.version}:{build_identity()}:{response_settings}:{climate.processor.dataset_version}",
 )
 
 # Configuration CORS
@@ -29,7 +48,7 @@ app.include_router(climate.router, prefix="/api/v1/climate", tags=["climate"])
 async def root():
     return {
         "message": "API Données Climatiques Sénégal",
-        "version": "1.0.0",
+        "version": app.version,
         "docs": "/docs",
         "health": "/api/v1/climate/health"
     }
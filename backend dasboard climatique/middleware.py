@@ -0,0 +1,328 @@
+"""
+Middlewares ASGI de l'API climatique.
+
+- ConditionalCacheMiddleware : ETag fort, Cache-Control et réponses 304
+- CompressionMiddleware      : compression gzip/brotli au-delà d'un seuil de taille
+
+Ordre d'empilement : cache conditionnel (extérieur), compression, application.
+"""
+import hashlib
+import os
+import zlib
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from services.result_cache import ResultCache
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle : gzip uniquement
+    brotli = None
+
+# ETag de la requête, transmis aux middlewares intérieurs (clé du cache de corps compressés)
+ETAG_SCOPE_KEY = "climate.etag"
+
+# Une représentation compressée a son propre ETag fort : "<etag>-gzip", "<etag>-br"
+ENCODINGS = ("br", "gzip")
+
+# Types déjà compressés : pas de seconde compression
+PRECOMPRESSED_MEDIA_TYPES = (
+    "application/gzip",
+    "application/vnd.apache.parquet",
+    "application/x-netcdf",
+    "application/zip",
+    "image/",
+    "audio/",
+    "video/",
+)
+
+
+def build_identity(root: Optional[Path] = None) -> str:
+    """Identité du code déployé, pour que l'ETag change avec la forme des réponses
+
+    CLIMATE_BUILD_ID (SHA git, numéro de build) si défini, sinon empreinte des
+    sources Python de l'application : l'image Docker ne contient pas .git.
+    """
+    build_id = os.getenv("CLIMATE_BUILD_ID")
+    if build_id:
+        return build_id
+    root = Path(root or Path(__file__).resolve().parent)
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*.py")):
+        if "__pycache__" in path.parts:
+            continue
+        digest.update(path.relative_to(root).as_posix().encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag de la représentation encodée (suffixe dans les guillemets)"""
+    if encoding not in ENCODINGS:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def split_etag(tag: str) -> Tuple[str, Optional[str]]:
+    """Sépare un ETag encodé en (ETag de base, encodage)"""
+    for encoding in ENCODINGS:
+        suffix = f'-{encoding}"'
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"', encoding
+    return tag, None
+
+
+class ConditionalCacheMiddleware:
+    """Cache HTTP conditionnel des endpoints de lecture
+
+    Les données sont statiques entre deux déploiements : l'ETag est dérivé de
+    la version du code et du jeu de données et de la requête (chemin, paramètres
+    triés, en-tête Accept), sans calculer la réponse. Un If-None-Match
+    correspondant reçoit donc un 304 avant même d'appeler l'application.
+    If-None-Match: * n'est pas court-circuité : sans appeler l'application,
+    rien ne garantit que la représentation existe (400, 404).
+    """
+
+    def __init__(self, app, version: str, prefix: str = "/api/v1/climate",
+                 exclude: Iterable[str] = ("/health", "/cache/stats"),
+                 max_age: int = None):
+        self.app = app
+        self.version = version
+        self.prefix = prefix
+        self.exclude = {prefix + path for path in exclude}
+        if max_age is None:
+            max_age = int(os.getenv("CLIMATE_HTTP_MAX_AGE", "86400"))
+        self.cache_control = f"public, max-age={max_age}"
+
+    def is_cacheable(self, scope) -> bool:
+        return (
+            scope["type"] == "http"
+            and scope["method"] in ("GET", "HEAD")
+            and scope["path"].startswith(self.prefix)
+            and scope["path"] not in self.exclude
+        )
+
+    def etag_for(self, scope, headers: Headers) -> str:
+        """ETag fort de la représentation : version des données + requête normalisée"""
+        query = urlencode(sorted(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)))
+        accept = headers.get("accept", "").strip().lower()
+        identity = "\n".join((self.version, scope["path"], query, accept))
+        return '"' + hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32] + '"'
+
+    @staticmethod
+    def parse_if_none_match(value: str) -> List[str]:
+        """ETags listés dans If-None-Match (comparaison faible : préfixe W/ ignoré)"""
+        tags = []
+        for tag in value.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag:
+                tags.append(tag)
+        return tags
+
+    def matching_tag(self, etag: str, if_none_match: str) -> Optional[str]:
+        """ETag (éventuellement encodé) de If-None-Match correspondant à la requête, sinon None"""
+        for tag in self.parse_if_none_match(if_none_match):
+            if split_etag(tag)[0] == etag:
+                return tag
+        return None
+
+    def cache_headers(self, tag: str) -> MutableHeaders:
+        headers = MutableHeaders()
+        headers["etag"] = tag
+        headers["cache-control"] = self.cache_control
+        headers.add_vary_header("Accept")
+        if split_etag(tag)[1] is not None:
+            headers.add_vary_header("Accept-Encoding")
+        return headers
+
+    async def __call__(self, scope, receive, send):
+        if not self.is_cacheable(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        etag = self.etag_for(scope, request_headers)
+
+        if_none_match = request_headers.get("if-none-match")
+        matched = self.matching_tag(etag, if_none_match) if if_none_match else None
+        if matched is not None:
+            await send({"type": "http.response.start", "status": 304,
+                        "headers": self.cache_headers(matched).raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        scope[ETAG_SCOPE_KEY] = etag
+
+        async def send_with_etag(message):
+            # Seules les réponses 200 sont marquées cachables (pas les erreurs)
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(raw=message["headers"])
+                headers.setdefault("etag", encoded_etag(etag, headers.get("content-encoding")))
+                headers.setdefault("cache-control", self.cache_control)
+                headers.add_vary_header("Accept")
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+
+def _new_compressor(encoding: str, gzip_level: int,
+                    brotli_quality: int) -> Tuple[Callable, Callable, Callable]:
+    """Fonctions (compresser, vider par bloc, terminer) d'un flux compressé"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=brotli_quality)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # wbits=31 : en-tête gzip
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+class CompressionMiddleware:
+    """Compression gzip/brotli des réponses au-delà d'un seuil de taille
+
+    Les réponses en un bloc sont compressées entièrement ; les réponses
+    diffusées (exports) sont compressées bloc par bloc avec un vidage
+    synchronisé, pour que chaque bloc parte sans attendre la fin du flux.
+    Les corps compressés des réponses portant un ETag sont gardés en cache
+    (clé : ETag, encodage) et resservis sans rappeler l'application.
+    """
+
+    def __init__(self, app, minimum_size: int = None, gzip_level: int = 6,
+                 brotli_quality: int = 5, cache_max_bytes: int = None):
+        self.app = app
+        if minimum_size is None:
+            minimum_size = int(os.getenv("CLIMATE_COMPRESS_MIN_BYTES", "1024"))
+        if cache_max_bytes is None:
+            cache_max_bytes = int(float(os.getenv("CLIMATE_COMPRESS_CACHE_MB", "32")) * 1024 * 1024)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        # Pas d'expiration : l'ETag change avec la version des données
+        self._cache = ResultCache(max_bytes=cache_max_bytes, ttl=float("inf"))
+
+    @staticmethod
+    def select_encoding(accept_encoding: str) -> Optional[str]:
+        """Meilleur encodage accepté par le client (brotli préféré à qualité égale)"""
+        qualities = {}
+        for part in accept_encoding.split(","):
+            name, _, params = part.strip().partition(";")
+            q = 1.0
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if key == "q":
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            qualities[name.strip().lower()] = q
+
+        candidates = [enc for enc in ENCODINGS if enc != "br" or brotli is not None]
+        best, best_q = None, 0.0
+        for encoding in candidates:
+            q = qualities.get(encoding, qualities.get("*", 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        compress, _, finish = _new_compressor(encoding, self.gzip_level, self.brotli_quality)
+        return compress(body) + finish()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = scope.get(ETAG_SCOPE_KEY)
+        cache_key = f"{etag}:{encoding}" if etag and scope["method"] == "GET" else None
+        if cache_key is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                headers, body = cached
+                await send({"type": "http.response.start", "status": 200, "headers": list(headers)})
+                await send({"type": "http.response.body", "body": body})
+                return
+
+        responder = _CompressingResponder(self, encoding, cache_key, send)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingResponder:
+    """Intercepte les messages ASGI d'une réponse et compresse son corps"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str,
+                 cache_key: Optional[str], send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.cache_key = cache_key
+        self.send = send
+        self.start_message = None
+        self.passthrough = False
+        self.stream = None
+
+    def _should_compress(self, message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] != 200 or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return not content_type.startswith(PRECOMPRESSED_MEDIA_TYPES)
+
+    def _encoded_headers(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        return headers
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            # L'envoi de l'en-tête attend le premier bloc (taille et mode connus)
+            self.start_message = message
+            self.passthrough = not self._should_compress(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is None:
+            if not more_body:
+                await self._send_whole(body)
+                return
+
+            # Réponse diffusée : compression bloc par bloc, taille inconnue
+            headers = self._encoded_headers()
+            del headers["content-length"]
+            self.stream = _new_compressor(self.encoding, self.middleware.gzip_level,
+                                          self.middleware.brotli_quality)
+            await self.send(self.start_message)
+
+        compress, flush, finish = self.stream
+        data = compress(body) + (flush() if more_body else finish())
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def _send_whole(self, body: bytes):
+        if len(body) < self.middleware.minimum_size:
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        compressed = self.middleware.compress(body, self.encoding)
+        headers = self._encoded_headers()
+        headers["content-length"] = str(len(compressed))
+        if self.cache_key is not None:
+            self.middleware._cache.set(self.cache_key, (tuple(self.start_message["headers"]), compressed))
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": compressed})
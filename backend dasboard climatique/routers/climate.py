@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse, PlainTextResponse
-from fastapi.staticfiles import StaticFiles
-from services.csv_data_processing import ClimateDataProcessor
-from typing import Optional
-import os
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from services.anomalies import DEFAULT_BASELINE
+from services.compute_pool import ComputePool
+from services.csv_data_processing import ClimateDataProcessor, SEASONS, SERIES_FREQUENCIES, resolve_months
+from services.downsampling import DOWNSAMPLING_METHODS, MIN_POINTS
+from services.exporters import EXPORT_FORMATS
+from services.extreme_indices import INDICES
+from services.fast_json import FastJSONResponse, dumps
+from services.grid_payload import encode_binary, negotiate
+from services.spells import DEFAULT_MIN_DAYS, THRESHOLD_TYPES
+from typing import List, Optional
 import sys
 sys.path.append('..')
 
@@ -12,15 +18,36 @@ router = APIRouter()
 # Instance globale du processeur de données CSV optimisé
 processor = ClimateDataProcessor()
 
+# Pool de calcul : les appels au processeur ne bloquent pas la boucle asyncio
+# (catégories "query", "spatial" et "export", chacune avec sa limite de concurrence)
+compute_pool = ComputePool.from_env()
+
+# Les endpoints JSON retournent directement une FastJSONResponse : les tableaux et
+# scalaires NumPy sont sérialisés par orjson sans passer par jsonable_encoder
+
+# Catalogue des localités : immuable, sérialisé une seule fois au démarrage
+LOCALITIES_BODY = dumps(processor.get_available_localities())
+
+# Coordonnées ou localités au maximum par requête pour les endpoints par lot
+MAX_BATCH_POINTS = 100
+
 @router.get("/health")
 async def health_check():
     """Vérification de l'état de l'API"""
     try:
-        return {
+        return FastJSONResponse({
             "status": "healthy",
             "message": "API Climate opérationnelle",
             "version": "1.0.0"
-        }
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Retourne les statistiques du cache de résultats du worker courant"""
+    try:
+        return FastJSONResponse(processor.get_cache_stats())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -30,10 +57,10 @@ async def get_variables():
     try:
         variables = processor.get_available_variables()
         time_range = processor.get_time_range()
-        return {
+        return FastJSONResponse({
             "variables": variables,
             "time_range": time_range
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -42,12 +69,12 @@ async def get_available_years():
     """Retourne rapidement la liste de toutes les années disponibles"""
     try:
         years = processor.get_available_years()
-        return {
+        return FastJSONResponse({
             "years": years,
             "total": len(years),
             "start_year": min(years) if years else None,
             "end_year": max(years) if years else None
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -65,8 +92,8 @@ async def get_time_series(
         if start_year > end_year:
             raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
         
-        result = processor.get_time_series(var, start_year, end_year)
-        return result
+        result = await compute_pool.run("query", processor.get_time_series, var, start_year, end_year)
+        return FastJSONResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -84,19 +111,26 @@ async def get_climatology(
         if start_year > end_year:
             raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
         
-        result = processor.get_climatology(var, start_year, end_year)
-        return result
+        result = await compute_pool.run("query", processor.get_climatology, var, start_year, end_year)
+        return FastJSONResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/spatial")
 async def get_spatial_data(
+    request: Request,
     var: str = Query(..., description="Variable (tasmin ou tasmax)"),
-    month: int = Query(..., description="Mois (1-12)", ge=1, le=12),
     start_year: int = Query(..., description="Année de début"),
-    end_year: int = Query(..., description="Année de fin")
+    end_year: int = Query(..., description="Année de fin"),
+    month: Optional[int] = Query(None, description="Mois (1-12)", ge=1, le=12),
+    months: Optional[List[int]] = Query(None, description="Liste de mois (répétable)"),
+    season: Optional[str] = Query(None, description=f"Saison nommée ({', '.join(SEASONS)})"),
+    format: str = Query("records", description="records (liste de points) ou grid (matrice dense)")
 ):
-    """Retourne les données spatiales pour un mois donné"""
+    """Retourne les données spatiales pour un mois, une liste de mois ou une saison
+    
+    En-tête Accept application/x-npy ou application/vnd.apache.arrow.stream : grille binaire.
+    """
     try:
         if var not in ["tasmin", "tasmax"]:
             raise HTTPException(status_code=400, detail="Variable doit être 'tasmin' ou 'tasmax'")
@@ -104,8 +138,28 @@ async def get_spatial_data(
         if start_year > end_year:
             raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
         
-        result = processor.get_spatial_data(var, month, start_year, end_year)
-        return result
+        try:
+            selected_months = resolve_months(month, months, season)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if format not in ("records", "grid"):
+            raise HTTPException(status_code=400, detail="Format doit être 'records' ou 'grid'")
+        
+        # Un mois seul garde la clé de cache historique ; sinon la liste normalisée
+        month_arg = selected_months[0] if len(selected_months) == 1 else list(selected_months)
+        binary_type = negotiate(request.headers.get("accept"))
+        if binary_type is None and format == "records":
+            result = await compute_pool.run("spatial", processor.get_spatial_data, var, month_arg, start_year, end_year)
+            return FastJSONResponse(result)
+        
+        grid = await compute_pool.run("spatial", processor.get_spatial_grid, var, month_arg, start_year, end_year)
+        if binary_type is not None:
+            body, headers = encode_binary(grid, binary_type)
+            return Response(content=body, media_type=binary_type, headers=headers)
+        return FastJSONResponse(grid)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -123,8 +177,281 @@ async def get_statistics(
         if start_year > end_year:
             raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
         
-        result = processor.get_statistics(var, start_year, end_year)
-        return result
+        result = await compute_pool.run("query", processor.get_statistics, var, start_year, end_year)
+        return FastJSONResponse(result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/anomalies/time-series")
+async def get_anomaly_time_series(
+    var: str = Query(..., description="Variable (tasmin ou tasmax)"),
+    start_year: int = Query(..., description="Année de début"),
+    end_year: int = Query(..., description="Année de fin"),
+    baseline_start: int = Query(DEFAULT_BASELINE[0], description="Début de la période de référence"),
+    baseline_end: int = Query(DEFAULT_BASELINE[1], description="Fin de la période de référence"),
+    lat_idx: Optional[int] = Query(None, description="Index de latitude (série nationale si absent)", ge=0, le=20),
+    lon_idx: Optional[int] = Query(None, description="Index de longitude (série nationale si absent)", ge=0, le=28)
+):
+    """Retourne les anomalies annuelles par rapport à la période de référence"""
+    try:
+        if var not in ["tasmin", "tasmax"]:
+            raise HTTPException(status_code=400, detail="Variable doit être 'tasmin' ou 'tasmax'")
+        
+        if start_year > end_year:
+            raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
+        
+        try:
+            result = await compute_pool.run(
+                "query", processor.get_anomaly_time_series, var, start_year, end_year,
+                baseline_start, baseline_end, lat_idx, lon_idx
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/anomalies/monthly")
+async def get_monthly_anomalies(
+    var: str = Query(..., description="Variable (tasmin ou tasmax)"),
+    start_year: int = Query(..., description="Année de début"),
+    end_year: int = Query(..., description="Année de fin"),
+    baseline_start: int = Query(DEFAULT_BASELINE[0], description="Début de la période de référence"),
+    baseline_end: int = Query(DEFAULT_BASELINE[1], description="Fin de la période de référence"),
+    lat_idx: Optional[int] = Query(None, description="Index de latitude (série nationale si absent)", ge=0, le=20),
+    lon_idx: Optional[int] = Query(None, description="Index de longitude (série nationale si absent)", ge=0, le=28)
+):
+    """Retourne les anomalies mensuelles par rapport à la normale de chaque mois"""
+    try:
+        if var not in ["tasmin", "tasmax"]:
+            raise HTTPException(status_code=400, detail="Variable doit être 'tasmin' ou 'tasmax'")
+        
+        if start_year > end_year:
+            raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
+        
+        try:
+            result = await compute_pool.run(
+                "query", processor.get_monthly_anomalies, var, start_year, end_year,
+                baseline_start, baseline_end, lat_idx, lon_idx
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/anomalies/spatial")
+async def get_spatial_anomalies(
+    request: Request,
+    var: str = Query(..., description="Variable (tasmin ou tasmax)"),
+    start_year: int = Query(..., description="Année de début"),
+    end_year: int = Query(..., description="Année de fin"),
+    month: Optional[int] = Query(None, description="Mois (1-12)", ge=1, le=12),
+    months: Optional[List[int]] = Query(None, description="Liste de mois (répétable)"),
+    season: Optional[str] = Query(None, description=f"Saison nommée ({', '.join(SEASONS)})"),
+    baseline_start: int = Query(DEFAULT_BASELINE[0], description="Début de la période de référence"),
+    baseline_end: int = Query(DEFAULT_BASELINE[1], description="Fin de la période de référence")
+):
+    """Retourne la grille dense des anomalies pour un mois, une liste de mois ou une saison
+    
+    En-tête Accept application/x-npy ou application/vnd.apache.arrow.stream : grille binaire.
+    """
+    try:
+        if var not in ["tasmin", "tasmax"]:
+            raise HTTPException(status_code=400, detail="Variable doit être 'tasmin' ou 'tasmax'")
+        
+        if start_year > end_year:
+            raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
+        
+        try:
+            selected_months = resolve_months(month, months, season)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        month_arg = selected_months[0] if len(selected_months) == 1 else list(selected_months)
+        try:
+            grid = await compute_pool.run(
+                "spatial", processor.get_spatial_anomalies, var, month_arg, start_year, end_year,
+                baseline_start, baseline_end
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        binary_type = negotiate(request.headers.get("accept"))
+        if binary_type is not None:
+            body, headers = encode_binary(grid, binary_type)
+            return Response(content=body, media_type=binary_type, headers=headers)
+        return FastJSONResponse(grid)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/trends")
+async def get_trend_map(
+    var: str = Query(..., description="Variable (tasmin ou tasmax)"),
+    start_year: int = Query(..., description="Année de début"),
+    end_year: int = Query(..., description="Année de fin"),
+    alpha: float = Query(0.05, description="Seuil de significativité (test de Student bilatéral)", gt=0, lt=1)
+):
+    """Retourne la tendance linéaire (°C/décennie), son erreur type et un masque de significativité par point de grille"""
+    try:
+        if var not in ["tasmin", "tasmax"]:
+            raise HTTPException(status_code=400, detail="Variable doit être 'tasmin' ou 'tasmax'")
+        
+        if start_year > end_year:
+            raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
+        
+        try:
+            result = await compute_pool.run("spatial", processor.get_trend_map, var, start_year, end_year, alpha)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/indices")
+async def get_extreme_indices():
+    """Retourne la liste des indices d'extrêmes ETCCDI disponibles"""
+    try:
+        return FastJSONResponse(processor.get_extreme_indices_catalogue())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/indices/time-series")
+async def get_index_time_series(
+    index: str = Query(..., description=f"Indice ETCCDI ({', '.join(INDICES)})"),
+    start_year: int = Query(..., description="Année de début"),
+    end_year: int = Query(..., description="Année de fin"),
+    baseline_start: int = Query(DEFAULT_BASELINE[0], description="Début de la période de base des centiles"),
+    baseline_end: int = Query(DEFAULT_BASELINE[1], description="Fin de la période de base des centiles"),
+    lat_idx: Optional[int] = Query(None, description="Index de latitude (moyenne nationale si absent)", ge=0, le=20),
+    lon_idx: Optional[int] = Query(None, description="Index de longitude (moyenne nationale si absent)", ge=0, le=28)
+):
+    """Retourne la série annuelle d'un indice d'extrêmes, nationale ou en un point de grille"""
+    try:
+        if index not in INDICES:
+            raise HTTPException(status_code=400, detail=f"Indice doit être parmi: {', '.join(INDICES)}")
+        
+        if start_year > end_year:
+            raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
+        
+        try:
+            result = await compute_pool.run(
+                "spatial", processor.get_index_time_series, index, start_year, end_year,
+                baseline_start, baseline_end, lat_idx, lon_idx
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/indices/spatial")
+async def get_index_map(
+    index: str = Query(..., description=f"Indice ETCCDI ({', '.join(INDICES)})"),
+    start_year: int = Query(..., description="Année de début"),
+    end_year: int = Query(..., description="Année de fin"),
+    baseline_start: int = Query(DEFAULT_BASELINE[0], description="Début de la période de base des centiles"),
+    baseline_end: int = Query(DEFAULT_BASELINE[1], description="Fin de la période de base des centiles")
+):
+    """Retourne la grille dense de la moyenne annuelle d'un indice d'extrêmes sur la période"""
+    try:
+        if index not in INDICES:
+            raise HTTPException(status_code=400, detail=f"Indice doit être parmi: {', '.join(INDICES)}")
+        
+        if start_year > end_year:
+            raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
+        
+        try:
+            result = await compute_pool.run(
+                "spatial", processor.get_index_map, index, start_year, end_year, baseline_start, baseline_end
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/spells/spatial")
+async def get_spell_map(
+    var: str = Query(..., description="Variable (tasmin ou tasmax)"),
+    start_year: int = Query(..., description="Année de début"),
+    end_year: int = Query(..., description="Année de fin"),
+    threshold_type: str = Query("percentile", description="Seuil absolu (°C) ou centile de la période de base"),
+    threshold: float = Query(90.0, description="Valeur du seuil : °C (absolute) ou centile 0-100 (percentile)"),
+    min_days: int = Query(DEFAULT_MIN_DAYS, description="Durée minimale d'une séquence (jours consécutifs)", ge=1, le=60),
+    baseline_start: int = Query(DEFAULT_BASELINE[0], description="Début de la période de base des centiles"),
+    baseline_end: int = Query(DEFAULT_BASELINE[1], description="Fin de la période de base des centiles")
+):
+    """Retourne les grilles des séquences de jours chauds : nombre, durée maximale et jours en séquence"""
+    try:
+        if var not in ["tasmin", "tasmax"]:
+            raise HTTPException(status_code=400, detail="Variable doit être 'tasmin' ou 'tasmax'")
+        
+        if start_year > end_year:
+            raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
+        
+        if threshold_type not in THRESHOLD_TYPES:
+            raise HTTPException(status_code=400, detail=f"Type de seuil doit être parmi: {', '.join(THRESHOLD_TYPES)}")
+        
+        try:
+            result = await compute_pool.run(
+                "spatial", processor.get_spell_map, var, start_year, end_year,
+                threshold_type, threshold, min_days, baseline_start, baseline_end
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/spells/time-series")
+async def get_spell_series(
+    var: str = Query(..., description="Variable (tasmin ou tasmax)"),
+    lat_idx: int = Query(..., description="Index de latitude", ge=0, le=20),
+    lon_idx: int = Query(..., description="Index de longitude", ge=0, le=28),
+    start_year: int = Query(..., description="Année de début"),
+    end_year: int = Query(..., description="Année de fin"),
+    threshold_type: str = Query("percentile", description="Seuil absolu (°C) ou centile de la période de base"),
+    threshold: float = Query(90.0, description="Valeur du seuil : °C (absolute) ou centile 0-100 (percentile)"),
+    min_days: int = Query(DEFAULT_MIN_DAYS, description="Durée minimale d'une séquence (jours consécutifs)", ge=1, le=60),
+    baseline_start: int = Query(DEFAULT_BASELINE[0], description="Début de la période de base des centiles"),
+    baseline_end: int = Query(DEFAULT_BASELINE[1], description="Fin de la période de base des centiles")
+):
+    """Retourne les séquences annuelles de jours chauds en un point de grille (localité)"""
+    try:
+        if var not in ["tasmin", "tasmax"]:
+            raise HTTPException(status_code=400, detail="Variable doit être 'tasmin' ou 'tasmax'")
+        
+        if start_year > end_year:
+            raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
+        
+        if threshold_type not in THRESHOLD_TYPES:
+            raise HTTPException(status_code=400, detail=f"Type de seuil doit être parmi: {', '.join(THRESHOLD_TYPES)}")
+        
+        try:
+            result = await compute_pool.run(
+                "spatial", processor.get_spell_series, var, lat_idx, lon_idx, start_year, end_year,
+                threshold_type, threshold, min_days, baseline_start, baseline_end
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -135,9 +462,9 @@ async def download_data(
     end_year: int = Query(..., description="Année de fin"),
     lat_idx: Optional[int] = Query(None, description="Index de latitude pour localité spécifique"),
     lon_idx: Optional[int] = Query(None, description="Index de longitude pour localité spécifique"),
-    format_type: str = Query("csv", description="Format de téléchargement")
+    format_type: str = Query("csv", description="Format de téléchargement (csv, csv.gz, parquet, netcdf)")
 ):
-    """Télécharge les données dans le format demandé - VERSION CSV OPTIMISÉE"""
+    """Télécharge les données dans le format demandé, diffusées par blocs"""
     try:
         if var not in ["tasmin", "tasmax"]:
             raise HTTPException(status_code=400, detail="Variable doit être 'tasmin' ou 'tasmax'")
@@ -148,7 +475,9 @@ async def download_data(
         # Si des indices de localité sont fournis, retourner les données de cette localité
         if lat_idx is not None and lon_idx is not None:
             try:
-                csv_data = processor.get_locality_data_csv(var, lat_idx, lon_idx, start_year, end_year)
+                csv_data = await compute_pool.run(
+                    "export", processor.get_locality_data_csv, var, lat_idx, lon_idx, start_year, end_year
+                )
                 
                 filename = f"{var}_locality_{lat_idx}_{lon_idx}_{start_year}_{end_year}.csv"
                 
@@ -157,30 +486,38 @@ async def download_data(
                     media_type="text/csv",
                     headers={"Content-Disposition": f"attachment; filename={filename}"}
                 )
+            except HTTPException:
+                raise
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Erreur données localité: {str(e)}")
         
         # Sinon, exporter toutes les données (compatible avec l'ancienne version)
         else:
-            if format_type != "csv":
-                raise HTTPException(status_code=400, detail="Seul le format CSV est supporté en mode optimisé")
-            
-            # Exporter les données globales
-            filepath = processor.export_data_csv(var, start_year, end_year)
+            if format_type not in EXPORT_FORMATS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Format non supporté: {format_type} (formats: {', '.join(EXPORT_FORMATS)})"
+                )
             
-            # Vérifier que le fichier existe
-            if not os.path.exists(filepath):
-                raise HTTPException(status_code=500, detail="Erreur lors de la génération du fichier")
+            try:
+                # Diffuser les données globales par blocs (réponse chunked, sans fichier temporaire)
+                chunks = processor.export_data(var, start_year, end_year, format_type)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             
-            filename = f"{var}_{start_year}_{end_year}.csv"
+            media_type, extension = EXPORT_FORMATS[format_type]
+            filename = f"{var}_{start_year}_{end_year}.{extension}"
             
-            return FileResponse(
-                path=filepath,
-                filename=filename,
-                media_type="text/csv",
+            return StreamingResponse(
+                compute_pool.iterate("export", chunks),
+                media_type=media_type,
                 headers={"Content-Disposition": f"attachment; filename={filename}"}
             )
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -188,19 +525,55 @@ async def download_data(
 
 @router.get("/localities")
 async def get_localities():
-    """Retourne toutes les localités disponibles (villes + points de grille)"""
-    try:
-        localities = processor.get_available_localities()
-        return localities
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    """Retourne toutes les localités disponibles (villes + points de grille), pré-sérialisées"""
+    return Response(content=LOCALITIES_BODY, media_type="application/json")
 
 @router.get("/localities/cities")
 async def get_cities():
     """Retourne uniquement les villes principales du Sénégal"""
     try:
         cities = processor.get_cities()
-        return {"cities": cities, "count": len(cities)}
+        return FastJSONResponse({"cities": cities, "count": len(cities)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/localities/batch")
+async def get_localities_batch(
+    var: str = Query(..., description="Variable (tasmin ou tasmax)"),
+    start_year: int = Query(..., description="Année de début"),
+    end_year: int = Query(..., description="Année de fin"),
+    cities: Optional[List[str]] = Query(None, description="Noms de villes (répétable)"),
+    points: Optional[List[str]] = Query(None, description="Points de grille 'lat_idx,lon_idx' (répétable)")
+):
+    """Retourne les séries annuelles de plusieurs localités en une seule requête (toutes les villes par défaut)"""
+    try:
+        if var not in ["tasmin", "tasmax"]:
+            raise HTTPException(status_code=400, detail="Variable doit être 'tasmin' ou 'tasmax'")
+        
+        if start_year > end_year:
+            raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
+        
+        try:
+            grid_points = [tuple(int(i) for i in point.split(",")) for point in points or []]
+            if any(len(point) != 2 for point in grid_points):
+                raise ValueError
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Points attendus au format 'lat_idx,lon_idx'")
+        
+        if len(cities or []) + len(grid_points) > MAX_BATCH_POINTS:
+            raise HTTPException(status_code=400, detail=f"{MAX_BATCH_POINTS} localités au maximum par requête")
+        
+        try:
+            localities = processor.resolve_localities(cities, grid_points)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        result = await compute_pool.run(
+            "query", processor.get_localities_time_series, var, localities, start_year, end_year
+        )
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -213,11 +586,11 @@ async def get_grid_points(
         all_points = processor.get_grid_points()
         limited_points = all_points[:limit] if limit else all_points
         
-        return {
+        return FastJSONResponse({
             "grid_points": limited_points,
             "returned": len(limited_points),
             "total_available": len(all_points)
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -237,8 +610,57 @@ async def get_locality_time_series(
         if start_year > end_year:
             raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
         
-        result = processor.get_locality_time_series(var, lat_idx, lon_idx, start_year, end_year)
-        return result
+        try:
+            result = await compute_pool.run(
+                "query", processor.get_locality_time_series, var, lat_idx, lon_idx, start_year, end_year
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/localities/series")
+async def get_locality_series(
+    var: str = Query(..., description="Variable (tasmin ou tasmax)"),
+    lat_idx: int = Query(..., description="Index de latitude", ge=0, le=20),
+    lon_idx: int = Query(..., description="Index de longitude", ge=0, le=28),
+    start_year: int = Query(..., description="Année de début"),
+    end_year: int = Query(..., description="Année de fin"),
+    frequency: str = Query("annual", description="Fréquence: annual, monthly ou daily"),
+    points: Optional[int] = Query(None, description="Nombre maximal de points retournés (réduction côté serveur)", ge=MIN_POINTS, le=20000),
+    method: str = Query("lttb", description="Méthode de réduction: lttb ou minmax")
+):
+    """Série numérique d'un point de grille (moyennes annuelles, mensuelles ou valeurs journalières)
+    
+    Avec `points`, la série est réduite côté serveur (LTTB ou min/max par paquet) :
+    quelques Ko suffisent pour un graphique journalier zoomable.
+    """
+    try:
+        if var not in ["tasmin", "tasmax"]:
+            raise HTTPException(status_code=400, detail="Variable doit être 'tasmin' ou 'tasmax'")
+        
+        if start_year > end_year:
+            raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
+        
+        if frequency not in SERIES_FREQUENCIES:
+            raise HTTPException(status_code=400, detail=f"Fréquence doit être parmi: {', '.join(SERIES_FREQUENCIES)}")
+        
+        if method not in DOWNSAMPLING_METHODS:
+            raise HTTPException(status_code=400, detail=f"Méthode doit être parmi: {', '.join(DOWNSAMPLING_METHODS)}")
+        
+        try:
+            result = await compute_pool.run(
+                "query", processor.get_locality_series, var, lat_idx, lon_idx, start_year, end_year,
+                frequency, points, method
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -258,8 +680,15 @@ async def get_locality_statistics(
         if start_year > end_year:
             raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
         
-        result = processor.get_locality_statistics(var, lat_idx, lon_idx, start_year, end_year)
-        return result
+        try:
+            result = await compute_pool.run(
+                "query", processor.get_locality_statistics, var, lat_idx, lon_idx, start_year, end_year
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -271,7 +700,7 @@ async def find_locality_by_coordinates(
 ):
     """Trouve la localité la plus proche des coordonnées données"""
     try:
-        result = processor.find_locality_by_coordinates(lat, lon, tolerance)
+        result = await compute_pool.run("query", processor.find_locality_by_coordinates, lat, lon, tolerance)
         
         if result is None:
             raise HTTPException(
@@ -279,8 +708,83 @@ async def find_locality_by_coordinates(
                 detail=f"Aucun point de grille trouvé dans un rayon de {tolerance}° des coordonnées ({lat}, {lon})"
             )
         
-        return result
+        return FastJSONResponse(result)
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/localities/nearest")
+async def find_nearest_grid_points(
+    lat: List[float] = Query(..., description="Latitudes (répétable)"),
+    lon: List[float] = Query(..., description="Longitudes (répétable, même nombre que lat)")
+):
+    """Points de grille les plus proches d'un lot de coordonnées"""
+    try:
+        if len(lat) != len(lon):
+            raise HTTPException(status_code=400, detail="Autant de latitudes que de longitudes sont attendues")
+        
+        if len(lat) > MAX_BATCH_POINTS:
+            raise HTTPException(status_code=400, detail=f"{MAX_BATCH_POINTS} points au maximum par requête")
+        
+        points = await compute_pool.run("query", processor.find_nearest_grid_points, lat, lon)
+        return FastJSONResponse({"points": points, "count": len(points)})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/localities/radius")
+async def find_grid_points_within(
+    lat: float = Query(..., description="Latitude"),
+    lon: float = Query(..., description="Longitude"),
+    radius_km: float = Query(50.0, description="Rayon de recherche en km", gt=0, le=1000)
+):
+    """Points de grille situés dans un rayon donné, du plus proche au plus lointain"""
+    try:
+        points = await compute_pool.run("query", processor.find_grid_points_within, lat, lon, radius_km)
+        return FastJSONResponse({
+            "target_latitude": lat,
+            "target_longitude": lon,
+            "radius_km": radius_km,
+            "points": points,
+            "count": len(points)
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/localities/interpolate")
+async def get_interpolated_points(
+    var: str = Query(..., description="Variable (tasmin ou tasmax)"),
+    lat: List[float] = Query(..., description="Latitudes (répétable)"),
+    lon: List[float] = Query(..., description="Longitudes (répétable, même nombre que lat)"),
+    start_year: int = Query(..., description="Année de début"),
+    end_year: int = Query(..., description="Année de fin")
+):
+    """Séries annuelles et statistiques interpolées (bilinéaire) en des coordonnées quelconques"""
+    try:
+        if var not in ["tasmin", "tasmax"]:
+            raise HTTPException(status_code=400, detail="Variable doit être 'tasmin' ou 'tasmax'")
+        
+        if start_year > end_year:
+            raise HTTPException(status_code=400, detail="L'année de début doit être <= année de fin")
+        
+        if len(lat) != len(lon):
+            raise HTTPException(status_code=400, detail="Autant de latitudes que de longitudes sont attendues")
+        
+        if len(lat) > MAX_BATCH_POINTS:
+            raise HTTPException(status_code=400, detail=f"{MAX_BATCH_POINTS} points au maximum par requête")
+        
+        try:
+            result = await compute_pool.run(
+                "query", processor.get_interpolated_points, var, lat, lon, start_year, end_year
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,159 @@
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from .climate_cube import ClimateCube
+
+
+class AggregateIndex:
+    """Agrégats par (année, mois, point de grille) avec sommes cumulées le long des années
+
+    Pour toute période [start_year, end_year], les sommes, sommes des carrés et
+    effectifs s'obtiennent par différence de deux entrées cumulées ; les extrêmes
+    sont réduits sur les seuls agrégats annuels de la période.
+    """
+
+    # Tableaux persistés dans le magasin binaire
+    ARRAYS = ("years", "cum_sums", "cum_sumsq", "cum_counts", "mins", "maxs")
+
+    def __init__(self, years: np.ndarray, cum_sums: np.ndarray, cum_sumsq: np.ndarray,
+                 cum_counts: np.ndarray, mins: np.ndarray, maxs: np.ndarray):
+        # cum_* : (n_années + 1, 12, n_lat, n_lon), entrée 0 nulle
+        # mins / maxs : (n_années, 12, n_lat, n_lon)
+        self.years = np.asarray(years)
+        self.cum_sums = cum_sums
+        self.cum_sumsq = cum_sumsq
+        self.cum_counts = cum_counts
+        self.mins = mins
+        self.maxs = maxs
+
+        # Totaux nationaux cumulés (n_années + 1, 12) pour les requêtes sur toute la grille
+        self.national_cum_sums = cum_sums.sum(axis=(2, 3))
+        self.national_cum_sumsq = cum_sumsq.sum(axis=(2, 3))
+        self.national_cum_counts = cum_counts.sum(axis=(2, 3), dtype=np.int64)
+        with np.errstate(invalid="ignore"):
+            self.national_mins = np.fmin.reduce(mins.reshape(len(self.years), -1), axis=1)
+            self.national_maxs = np.fmax.reduce(maxs.reshape(len(self.years), -1), axis=1)
+
+    @classmethod
+    def from_cube(cls, cube: ClimateCube) -> "AggregateIndex":
+        """Calcule les agrégats (année, mois, point) en un passage sur le cube"""
+        years = cube.available_years
+        n_lat, n_lon = len(cube.latitudes), len(cube.longitudes)
+        shape = (len(years), 12, n_lat, n_lon)
+
+        sums = np.zeros(shape, dtype=np.float64)
+        sumsq = np.zeros(shape, dtype=np.float64)
+        counts = np.zeros(shape, dtype=np.int32)
+        mins = np.full(shape, np.nan, dtype=np.float32)
+        maxs = np.full(shape, np.nan, dtype=np.float32)
+
+        # Une année à la fois pour borner la mémoire temporaire
+        for k, year in enumerate(years):
+            sl = cube.time_slice(year, year)
+            block = np.asarray(cube.values[sl])
+            months = cube.months[sl]
+            starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+            month_idx = months[starts] - 1
+
+            valid = ~np.isnan(block)
+            filled = np.where(valid, block, 0).astype(np.float64)
+            sums[k, month_idx] = np.add.reduceat(filled, starts, axis=0)
+            sumsq[k, month_idx] = np.add.reduceat(filled * filled, starts, axis=0)
+            counts[k, month_idx] = np.add.reduceat(valid.astype(np.int32), starts, axis=0)
+            mins[k, month_idx] = np.fmin.reduceat(block, starts, axis=0)
+            maxs[k, month_idx] = np.fmax.reduceat(block, starts, axis=0)
+
+        return cls(years, _cumulate(sums), _cumulate(sumsq), _cumulate(counts), mins, maxs)
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "AggregateIndex":
+        return cls(*(arrays[name] for name in cls.ARRAYS))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    def year_bounds(self, start_year: int, end_year: int) -> Tuple[int, int]:
+        """Indices [i0, i1) des années de la période dans l'index"""
+        i0 = int(np.searchsorted(self.years, start_year, side="left"))
+        i1 = int(np.searchsorted(self.years, end_year, side="right"))
+        return i0, max(i0, i1)
+
+    def period_sums(self, start_year: int, end_year: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sommes, sommes des carrés et effectifs (12, lat, lon) sur la période"""
+        i0, i1 = self.year_bounds(start_year, end_year)
+        return (self.cum_sums[i1] - self.cum_sums[i0],
+                self.cum_sumsq[i1] - self.cum_sumsq[i0],
+                self.cum_counts[i1] - self.cum_counts[i0])
+
+    def period_extremes(self, start_year: int, end_year: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Minimums et maximums (12, lat, lon) sur la période"""
+        i0, i1 = self.year_bounds(start_year, end_year)
+        if i0 == i1:
+            empty = np.full(self.mins.shape[1:], np.nan, dtype=np.float32)
+            return empty, empty.copy()
+        return np.fmin.reduce(self.mins[i0:i1], axis=0), np.fmax.reduce(self.maxs[i0:i1], axis=0)
+
+    def annual_sums(self, start_year: int, end_year: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Années, sommes et effectifs annuels (n, lat, lon) de chaque point de grille"""
+        i0, i1 = self.year_bounds(start_year, end_year)
+        sums = (self.cum_sums[i0 + 1:i1 + 1] - self.cum_sums[i0:i1]).sum(axis=1)
+        counts = (self.cum_counts[i0 + 1:i1 + 1] - self.cum_counts[i0:i1]).sum(axis=1)
+        return self.years[i0:i1], sums, counts
+
+    def national_annual(self, start_year: int, end_year: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Années, sommes et effectifs annuels sur toute la grille"""
+        i0, i1 = self.year_bounds(start_year, end_year)
+        sums = np.diff(self.national_cum_sums[i0:i1 + 1].sum(axis=1))
+        counts = np.diff(self.national_cum_counts[i0:i1 + 1].sum(axis=1))
+        return self.years[i0:i1], sums, counts
+
+    def monthly_totals(self, start_year: int, end_year: int,
+                       point: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Années, sommes et effectifs (n, 12) de chaque mois, sur toute la grille ou en un point"""
+        i0, i1 = self.year_bounds(start_year, end_year)
+        if point is None:
+            cum_sums, cum_counts = self.national_cum_sums[i0:i1 + 1], self.national_cum_counts[i0:i1 + 1]
+        else:
+            lat_idx, lon_idx = point
+            cum_sums = self.cum_sums[i0:i1 + 1, :, lat_idx, lon_idx]
+            cum_counts = self.cum_counts[i0:i1 + 1, :, lat_idx, lon_idx]
+        return self.years[i0:i1], np.diff(cum_sums, axis=0), np.diff(cum_counts, axis=0)
+
+    def monthly_grid_totals(self, start_year: int, end_year: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Années, sommes et effectifs (n, 12, lat, lon) de chaque mois et point de grille"""
+        i0, i1 = self.year_bounds(start_year, end_year)
+        return (self.years[i0:i1], np.diff(self.cum_sums[i0:i1 + 1], axis=0),
+                np.diff(self.cum_counts[i0:i1 + 1], axis=0))
+
+    def national_period(self, start_year: int, end_year: int) -> Dict[str, np.ndarray]:
+        """Totaux mensuels (12,) et extrêmes sur toute la grille pour la période"""
+        i0, i1 = self.year_bounds(start_year, end_year)
+        return {
+            "sums": self.national_cum_sums[i1] - self.national_cum_sums[i0],
+            "sumsq": self.national_cum_sumsq[i1] - self.national_cum_sumsq[i0],
+            "counts": self.national_cum_counts[i1] - self.national_cum_counts[i0],
+            "min": np.fmin.reduce(self.national_mins[i0:i1]) if i1 > i0 else np.nan,
+            "max": np.fmax.reduce(self.national_maxs[i0:i1]) if i1 > i0 else np.nan,
+        }
+
+
+def _cumulate(values: np.ndarray) -> np.ndarray:
+    """Sommes cumulées le long des années, précédées d'une entrée nulle"""
+    dtype = np.int32 if np.issubdtype(values.dtype, np.integer) else np.float64
+    cumulative = np.zeros((values.shape[0] + 1,) + values.shape[1:], dtype=dtype)
+    np.cumsum(values, axis=0, dtype=dtype, out=cumulative[1:])
+    return cumulative
+
+
+def summarize(sums, sumsq, counts) -> Tuple[float, float, int]:
+    """Moyenne et écart-type corrigé (ddof=1) à partir des sommes agrégées"""
+    total = float(np.sum(sums))
+    total_sq = float(np.sum(sumsq))
+    count = int(np.sum(counts))
+    if count == 0:
+        return float("nan"), float("nan"), 0
+    mean = total / count
+    if count < 2:
+        return mean, float("nan"), count
+    variance = max((total_sq - total * mean) / (count - 1), 0.0)
+    return mean, float(np.sqrt(variance)), count
@@ -0,0 +1,112 @@
+"""
+Anomalies par rapport à une période de référence (normale climatologique).
+
+Les normales mensuelles de chaque point de grille sont tirées une seule fois
+de l'index d'agrégats (sommes cumulées par année et mois). Les anomalies
+annuelles, mensuelles et spatiales d'une période quelconque en découlent par
+soustraction de tableaux, sans relire les données journalières.
+
+Une anomalie agrégée est la moyenne des anomalies journalières, chaque jour
+étant comparé à la normale de son mois : Σ (sommes - effectifs × normale) / Σ
+effectifs. Une année incomplète n'est donc pas biaisée par le cycle saisonnier.
+"""
+import os
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .aggregate_index import AggregateIndex
+
+# Point de grille (lat_idx, lon_idx) ; None pour toute la grille
+GridPoint = Optional[Tuple[int, int]]
+
+
+def _default_baseline() -> Tuple[int, int]:
+    """Période de référence par défaut (CLIMATE_BASELINE, ex. "1961-1990")"""
+    start, _, end = os.getenv("CLIMATE_BASELINE", "1961-1990").partition("-")
+    return int(start), int(end)
+
+
+DEFAULT_BASELINE = _default_baseline()
+
+
+def _mean(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def daily_anomaly_mean(sums: np.ndarray, counts: np.ndarray, normals: np.ndarray,
+                       axis: int) -> np.ndarray:
+    """Moyenne des anomalies journalières de blocs mensuels, réduite le long de `axis`"""
+    excess = np.where(counts > 0, sums - counts * normals, 0.0)
+    return _mean(excess.sum(axis=axis), counts.sum(axis=axis))
+
+
+class Baseline(NamedTuple):
+    """Normale d'une période de référence : sommes et effectifs (12, lat, lon) par mois et point"""
+    start_year: int
+    end_year: int
+    years: np.ndarray
+    sums: np.ndarray
+    counts: np.ndarray
+
+    @classmethod
+    def from_aggregates(cls, aggregates: AggregateIndex, start_year: int, end_year: int) -> "Baseline":
+        if start_year > end_year:
+            raise ValueError("L'année de début de la période de référence doit être <= année de fin")
+        i0, i1 = aggregates.year_bounds(start_year, end_year)
+        sums, _, counts = aggregates.period_sums(start_year, end_year)
+        if not counts.any():
+            raise ValueError(f"Aucune donnée pour la période de référence {start_year}-{end_year}")
+        return cls(start_year, end_year, aggregates.years[i0:i1], sums, counts)
+
+    @property
+    def monthly(self) -> np.ndarray:
+        """Normales mensuelles (12, lat, lon)"""
+        return _mean(self.sums, self.counts)
+
+    def normals(self, point: GridPoint = None) -> np.ndarray:
+        """Normales mensuelles (12,) sur toute la grille ou en un point"""
+        if point is None:
+            return _mean(self.sums.sum(axis=(1, 2)), self.counts.sum(axis=(1, 2)))
+        lat_idx, lon_idx = point
+        return _mean(self.sums[:, lat_idx, lon_idx], self.counts[:, lat_idx, lon_idx])
+
+    def describe(self) -> Dict:
+        """Période demandée et années effectivement couvertes par les données"""
+        return {
+            "start_year": self.start_year,
+            "end_year": self.end_year,
+            "years_covered": len(self.years),
+            "first_year": int(self.years[0]) if len(self.years) else None,
+            "last_year": int(self.years[-1]) if len(self.years) else None,
+        }
+
+
+def annual_anomalies(aggregates: AggregateIndex, baseline: Baseline, start_year: int,
+                     end_year: int, point: GridPoint = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Années ayant des données et anomalies annuelles moyennes"""
+    years, sums, counts = aggregates.monthly_totals(start_year, end_year, point)
+    anomalies = daily_anomaly_mean(sums, counts, baseline.normals(point), axis=1)
+    keep = counts.sum(axis=1) > 0
+    return years[keep], anomalies[keep]
+
+
+def monthly_anomalies(aggregates: AggregateIndex, baseline: Baseline, start_year: int,
+                      end_year: int, point: GridPoint = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Mois (datetime64[M]) ayant des données et anomalies mensuelles moyennes"""
+    years, sums, counts = aggregates.monthly_totals(start_year, end_year, point)
+    anomalies = _mean(sums, counts) - baseline.normals(point)
+    # Mois depuis l'époque 1970-01 de datetime64
+    months = ((years[:, None] - 1970) * 12 + np.arange(12)).astype("datetime64[M]")
+    keep = counts > 0
+    return months[keep], anomalies[keep]
+
+
+def spatial_anomalies(aggregates: AggregateIndex, baseline: Baseline, months: Sequence[int],
+                      start_year: int, end_year: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Champ (lat, lon) des anomalies moyennes des mois retenus, et effectifs par point"""
+    month_idx = np.asarray(months) - 1
+    sums, _, counts = aggregates.period_sums(start_year, end_year)
+    sums, counts = sums[month_idx], counts[month_idx]
+    return daily_anomaly_mean(sums, counts, baseline.monthly[month_idx], axis=0), counts.sum(axis=0)
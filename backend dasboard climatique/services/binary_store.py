@@ -0,0 +1,272 @@
+"""
+Magasin binaire des cubes climatiques (fichiers .npy + manifeste JSON).
+
+Construit une seule fois à partir des CSV optimisés, puis ouvert en mémoire
+mappée (mmap) au démarrage : les pages sont partagées entre processus via le
+cache de pages du système.
+
+Utilisation en ligne de commande (depuis le dossier backend) :
+    python -m services.binary_store build [--data-dir data] [--force]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from .aggregate_index import AggregateIndex
+from .climate_cube import ClimateCube
+from .locality_index import LocalityIndex
+
+STORE_FORMAT_VERSION = 3
+MANIFEST_NAME = "manifest.json"
+STORE_DIR_NAME = "binary_store"
+
+VARIABLES = ("tasmin", "tasmax")
+CSV_TEMPLATE = "{variable}_daily_Senegal_1960_2024_optimized.csv"
+
+
+class StoreContents(NamedTuple):
+    """Contenu d'un magasin ouvert : cubes, index d'agrégats et de localités, manifeste"""
+    cubes: Dict[str, ClimateCube]
+    aggregates: Dict[str, AggregateIndex]
+    localities: Dict[str, LocalityIndex]
+    manifest: Dict
+
+
+def default_csv_paths(data_dir: Path) -> Dict[str, Path]:
+    """Chemins des CSV optimisés attendus dans data/csv_optimized"""
+    csv_dir = Path(data_dir) / "csv_optimized"
+    return {variable: csv_dir / CSV_TEMPLATE.format(variable=variable) for variable in VARIABLES}
+
+
+def read_csv_cube(csv_path: Path, variable: str) -> ClimateCube:
+    """Lit un CSV long et le convertit en cube dense (le DataFrame n'est pas conservé)"""
+    df = pd.read_csv(
+        csv_path,
+        usecols=['time', 'latitude', 'longitude', variable],
+        dtype={'latitude': np.float64, 'longitude': np.float64, variable: np.float32}
+    )
+    df['time'] = pd.to_datetime(df['time'])
+    return ClimateCube.from_dataframe(df, variable)
+
+
+def _source_signature(csv_path: Path) -> Dict:
+    """Signature (taille, date de modification) d'un CSV source"""
+    stat = csv_path.stat()
+    return {"file": csv_path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def read_manifest(store_dir: Path) -> Optional[Dict]:
+    """Lit le manifeste du magasin, None s'il est absent ou illisible"""
+    try:
+        with open(Path(store_dir) / MANIFEST_NAME) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def dataset_fingerprint(manifest: Dict) -> str:
+    """Empreinte stable du jeu de données : version du format, sources, formes et types
+
+    Identique dans tous les workers et d'une reconstruction à l'autre tant que
+    les CSV sources ne changent pas (la date de construction est ignorée).
+    """
+    identity = {
+        "format_version": manifest["format_version"],
+        "variables": {
+            variable: {key: entry[key] for key in ("source", "shape", "dtype")}
+            for variable, entry in manifest["variables"].items()
+        },
+    }
+    payload = json.dumps(identity, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+
+
+def is_store_current(store_dir: Path, csv_paths: Dict[str, Path]) -> bool:
+    """Vrai si le magasin existe, est au format courant et correspond aux CSV présents"""
+    manifest = read_manifest(store_dir)
+    if manifest is None or manifest.get("format_version") != STORE_FORMAT_VERSION:
+        return False
+
+    for variable, csv_path in csv_paths.items():
+        entry = manifest["variables"].get(variable)
+        if entry is None:
+            return False
+        # Sans CSV source, le magasin existant fait foi
+        if csv_path.exists() and entry["source"] != _source_signature(csv_path):
+            return False
+    return True
+
+
+def build_store(csv_paths: Dict[str, Path], store_dir: Path) -> Dict:
+    """Convertit les CSV en fichiers .npy et écrit le manifeste (remplacement atomique)"""
+    store_dir = Path(store_dir)
+    tmp_dir = store_dir.with_name(f".{store_dir.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    manifest = {"format_version": STORE_FORMAT_VERSION, "created_at": time.time(), "variables": {}}
+    try:
+        for variable, csv_path in csv_paths.items():
+            if not csv_path.exists():
+                raise FileNotFoundError(f"Fichier {variable} CSV introuvable: {csv_path}")
+            cube = read_csv_cube(csv_path, variable)
+
+            files = {
+                "values": f"{variable}.values.npy",
+                "time": f"{variable}.time.npy",
+                "latitudes": f"{variable}.latitudes.npy",
+                "longitudes": f"{variable}.longitudes.npy",
+            }
+            np.save(tmp_dir / files["values"], np.ascontiguousarray(cube.values, dtype=np.float32))
+            np.save(tmp_dir / files["time"], cube.times)
+            np.save(tmp_dir / files["latitudes"], cube.latitudes)
+            np.save(tmp_dir / files["longitudes"], cube.longitudes)
+
+            # Index d'agrégats (année, mois, point) précalculé une fois
+            aggregate_files = {}
+            for name, array in AggregateIndex.from_cube(cube).to_arrays().items():
+                aggregate_files[name] = f"{variable}.agg.{name}.npy"
+                np.save(tmp_dir / aggregate_files[name], array)
+
+            # Disposition triée par (lat_idx, lon_idx, temps) pour les localités
+            locality_files = {}
+            for name, array in LocalityIndex.from_cube(cube).to_arrays().items():
+                locality_files[name] = f"{variable}.points.{name}.npy"
+                np.save(tmp_dir / locality_files[name], array)
+
+            manifest["variables"][variable] = {
+                "files": files,
+                "aggregates": aggregate_files,
+                "localities": locality_files,
+                "shape": list(cube.shape),
+                "dtype": "float32",
+                "source": _source_signature(csv_path),
+            }
+
+        with open(tmp_dir / MANIFEST_NAME, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        # Remplacer l'ancien magasin seulement une fois le nouveau complet
+        if store_dir.exists():
+            old_dir = store_dir.with_name(f".{store_dir.name}.old-{os.getpid()}")
+            os.replace(store_dir, old_dir)
+            os.replace(tmp_dir, store_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+        else:
+            os.replace(tmp_dir, store_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return manifest
+
+
+def load_store(store_dir: Path) -> StoreContents:
+    """Ouvre les cubes et index du magasin en mémoire mappée (lecture seule)"""
+    store_dir = Path(store_dir)
+    manifest = read_manifest(store_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"Magasin binaire introuvable: {store_dir}")
+
+    cubes, aggregates, localities = {}, {}, {}
+    for variable, entry in manifest["variables"].items():
+        files = entry["files"]
+        values = np.load(store_dir / files["values"], mmap_mode="r")
+        if list(values.shape) != entry["shape"]:
+            raise RuntimeError(f"Magasin binaire corrompu pour {variable}: {values.shape}")
+        cubes[variable] = ClimateCube(
+            variable,
+            np.load(store_dir / files["time"]),
+            np.load(store_dir / files["latitudes"]),
+            np.load(store_dir / files["longitudes"]),
+            values
+        )
+        aggregates[variable] = AggregateIndex.from_arrays({
+            name: np.load(store_dir / filename, mmap_mode="r")
+            for name, filename in entry["aggregates"].items()
+        })
+        localities[variable] = LocalityIndex.from_arrays({
+            name: np.load(store_dir / filename, mmap_mode="r")
+            for name, filename in entry["localities"].items()
+        }, n_lon=values.shape[2])
+    return StoreContents(cubes, aggregates, localities, manifest)
+
+
+def prefetch_store(store_dir: Path):
+    """Lecture anticipée asynchrone des fichiers du magasin dans le cache de pages"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in Path(store_dir).glob("*.npy"):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
+
+@contextmanager
+def _build_lock(store_dir: Path):
+    """Verrou inter-processus pour qu'un seul worker construise le magasin"""
+    lock_path = store_dir.with_name(f".{store_dir.name}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "w") as lock_file:
+        try:
+            import fcntl
+        except ImportError:  # Plateformes sans fcntl : pas de verrou
+            yield
+            return
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def open_store(store_dir: Path, csv_paths: Dict[str, Path]) -> StoreContents:
+    """Ouvre le magasin, en le (re)construisant depuis les CSV au premier démarrage"""
+    store_dir = Path(store_dir)
+    if not is_store_current(store_dir, csv_paths):
+        with _build_lock(store_dir):
+            # Un autre worker a pu terminer la conversion pendant l'attente
+            if not is_store_current(store_dir, csv_paths):
+                build_store(csv_paths, store_dir)
+    return load_store(store_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construction du magasin binaire des données climatiques")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Convertir les CSV optimisés en magasin binaire")
+    build_parser.add_argument("--data-dir", default=str(Path(__file__).parent.parent / "data"),
+                              help="Dossier data contenant csv_optimized/")
+    build_parser.add_argument("--force", action="store_true",
+                              help="Reconstruire même si le magasin est à jour")
+
+    args = parser.parse_args(argv)
+    data_dir = Path(args.data_dir)
+    csv_paths = default_csv_paths(data_dir)
+    store_dir = data_dir / STORE_DIR_NAME
+
+    if not args.force and is_store_current(store_dir, csv_paths):
+        print(f"Magasin binaire déjà à jour: {store_dir}")
+        return
+
+    start = time.time()
+    with _build_lock(store_dir):
+        manifest = build_store(csv_paths, store_dir)
+    for variable, entry in manifest["variables"].items():
+        print(f"  {variable}: {entry['shape']} ({entry['dtype']})")
+    print(f"Magasin binaire écrit dans {store_dir} en {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+
+class ClimateCube:
+    """Cube dense (jours × latitudes × longitudes) en float32 pour une variable climatique"""
+
+    def __init__(self, variable: str, times: np.ndarray, latitudes: np.ndarray,
+                 longitudes: np.ndarray, values: np.ndarray):
+        if values.shape != (len(times), len(latitudes), len(longitudes)):
+            raise ValueError(f"Dimensions du cube incohérentes pour {variable}: {values.shape}")
+
+        self.variable = variable
+        self.times = np.asarray(times, dtype="datetime64[D]")
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.values = values
+
+        # Index temporel : année et mois de chaque jour (axe temps trié)
+        self.years = (self.times.astype("datetime64[Y]").astype(np.int64) + 1970).astype(np.int16)
+        self.months = (self.times.astype("datetime64[M]").astype(np.int64) % 12 + 1).astype(np.int8)
+        self.available_years = np.unique(self.years)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, variable: str) -> "ClimateCube":
+        """Construit le cube à partir d'un DataFrame long (time, latitude, longitude, variable)"""
+        times, t_idx = np.unique(df["time"].to_numpy(dtype="datetime64[D]"), return_inverse=True)
+        latitudes, lat_idx = np.unique(df["latitude"].to_numpy(), return_inverse=True)
+        longitudes, lon_idx = np.unique(df["longitude"].to_numpy(), return_inverse=True)
+
+        # Les cellules absentes du CSV restent à NaN
+        values = np.full((len(times), len(latitudes), len(longitudes)), np.nan, dtype=np.float32)
+        values[t_idx, lat_idx, lon_idx] = df[variable].to_numpy(dtype=np.float32)
+
+        return cls(variable, times, latitudes, longitudes, values)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.values.shape
+
+    def time_slice(self, start_year: int, end_year: int) -> slice:
+        """Tranche contiguë de l'axe temps couvrant [start_year, end_year]"""
+        start = int(np.searchsorted(self.years, start_year, side="left"))
+        stop = int(np.searchsorted(self.years, end_year, side="right"))
+        return slice(start, stop)
+
+    def iter_frames(self, start_year: int, end_year: int, days_per_chunk: int = 366):
+        """Génère des DataFrames longs (time, latitude, longitude, variable) par blocs de jours"""
+        sl = self.time_slice(start_year, end_year)
+        n_lat, n_lon = len(self.latitudes), len(self.longitudes)
+        for start in range(sl.start, sl.stop, days_per_chunk):
+            stop = min(start + days_per_chunk, sl.stop)
+            block = self.values[start:stop].reshape(stop - start, n_lat * n_lon)
+            t_idx, cell_idx = np.nonzero(~np.isnan(block))
+            yield pd.DataFrame({
+                "time": self.times[start:stop][t_idx],
+                "latitude": self.latitudes[cell_idx // n_lon],
+                "longitude": self.longitudes[cell_idx % n_lon],
+                self.variable: block[t_idx, cell_idx],
+            })
+
+
+def calendar_days(times: np.ndarray) -> np.ndarray:
+    """Jour calendaire (0-364) de chaque date ; le 29 février est rattaché au 28"""
+    times = np.asarray(times, dtype="datetime64[D]")
+    day = (times - times.astype("datetime64[Y]")).astype(np.int64)
+    years = times.astype("datetime64[Y]").astype(np.int64) + 1970
+    leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    # À partir du 29 février (jour 59) d'une année bissextile : décalage d'un jour
+    return np.where(leap & (day >= 59), day - 1, day)
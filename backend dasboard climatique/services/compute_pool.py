@@ -0,0 +1,90 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional
+
+_END = object()
+
+
+class ComputePool:
+    """Exécute les calculs du processeur hors de la boucle asyncio
+
+    Pool de threads borné (NumPy libère le GIL pendant les réductions et les
+    données mappées sont partagées entre threads), avec une limite de
+    concurrence par catégorie d'endpoint pour qu'un export ou une carte
+    coûteuse ne monopolise pas le worker.
+    """
+
+    def __init__(self, max_workers: int, limits: Dict[str, int]):
+        self.max_workers = max_workers
+        self.limits = limits
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ComputePool":
+        """Configuration : CLIMATE_POOL_THREADS et CLIMATE_LIMIT_<CATÉGORIE>"""
+        threads = int(os.getenv("CLIMATE_POOL_THREADS", os.cpu_count() or 2))
+        defaults = {"query": threads * 2, "spatial": threads, "export": max(1, threads // 2)}
+        limits = {
+            category: int(os.getenv(f"CLIMATE_LIMIT_{category.upper()}", default))
+            for category, default in defaults.items()
+        }
+        return cls(threads, limits)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Créé paresseusement dans chaque worker (l'application est préchargée avant le fork)
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="climate-compute")
+                self._executor_pid = os.getpid()
+                self._semaphores = {}
+            return self._executor
+
+    def _get_semaphore(self, category: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(category)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limits.get(category, self.max_workers))
+            self._semaphores[category] = semaphore
+        return semaphore
+
+    async def run(self, category: str, fn: Callable, *args, **kwargs):
+        """Exécute fn(*args, **kwargs) dans le pool en respectant la limite de la catégorie"""
+        executor = self._get_executor()
+        async with self._get_semaphore(category):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+    async def iterate(self, category: str, iterator: Iterator) -> AsyncIterator:
+        """Consomme un itérateur bloquant (flux d'export) bloc par bloc dans le pool
+
+        La limite de la catégorie est prise pour chaque bloc et non pour tout le
+        flux : un client lent ne garde pas de place entre deux blocs.
+        """
+        executor = self._get_executor()
+        semaphore = self._get_semaphore(category)
+        loop = asyncio.get_running_loop()
+        pending = None
+        try:
+            while True:
+                async with semaphore:
+                    pending = loop.run_in_executor(executor, next, iterator, _END)
+                    # shield : une annulation laisse le bloc en cours se terminer dans le pool
+                    chunk = await asyncio.shield(pending)
+                pending = None
+                if chunk is _END:
+                    break
+                yield chunk
+        finally:
+            # Client déconnecté : libérer les ressources du générateur (fichiers temporaires),
+            # après le bloc éventuellement en cours (close() pendant next() échouerait)
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                if pending is not None and not pending.done():
+                    pending.add_done_callback(lambda _: executor.submit(close))
+                else:
+                    close()
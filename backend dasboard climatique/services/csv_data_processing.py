@@ -1,10 +1,81 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 import os
 from pathlib import Path
-from functools import lru_cache
+from functools import lru_cache, wraps
+import inspect
 import time
+import warnings
+
+from .aggregate_index import AggregateIndex, summarize
+from .anomalies import DEFAULT_BASELINE, Baseline
+from .extreme_indices import INDICES, ExtremeIndices
+from .spells import DEFAULT_MIN_DAYS, THRESHOLD_TYPES, SpellTable
+from .climate_cube import ClimateCube
+from .locality_index import LocalityIndex
+from .result_cache import ResultCache
+from .single_flight import SingleFlight
+from .locality_catalogue import LocalityCatalogue
+from .spatial_index import SpatialIndex
+from .downsampling import downsample
+from . import anomalies, binary_store, exporters, extreme_indices, spells, trends
+
+# Saisons nommées -> mois civils (agrégés au sein de chaque année : DJF = jan, fév et déc)
+SEASONS: Dict[str, Tuple[int, ...]] = {
+    "DJF": (1, 2, 12),
+    "MAM": (3, 4, 5),
+    "JJA": (6, 7, 8),
+    "SON": (9, 10, 11),
+    "JJAS": (6, 7, 8, 9),
+    "ANNUAL": tuple(range(1, 13)),
+}
+
+# Fréquences des séries de localité (moyennes annuelles, mensuelles ou valeurs journalières)
+SERIES_FREQUENCIES = ("annual", "monthly", "daily")
+
+
+def resolve_months(month: Optional[int] = None, months: Optional[Sequence[int]] = None,
+                   season: Optional[str] = None) -> Tuple[int, ...]:
+    """Normalise un mois, une liste de mois ou une saison nommée en tuple trié de mois"""
+    if sum(x is not None and x != [] for x in (month, months, season)) != 1:
+        raise ValueError("Préciser exactement un paramètre parmi month, months et season")
+    if season is not None:
+        key = season.strip().upper()
+        if key not in SEASONS:
+            raise ValueError(f"Saison inconnue: {season} (saisons: {', '.join(SEASONS)})")
+        return SEASONS[key]
+    selected = tuple(sorted(set(months if months is not None else [month])))
+    if any(not 1 <= m <= 12 for m in selected):
+        raise ValueError("Les mois doivent être compris entre 1 et 12")
+    return selected
+
+def cached_result(method: str):
+    """Met en cache le résultat et partage les calculs identiques déjà en cours"""
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            # Arguments liés, valeurs par défaut comprises : f(a, b) et f(a, b, défaut)
+            # ou f(a, b=b) partagent la même clé et le même calcul en cours
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            cache_key = self._get_cache_key(method, *list(bound.arguments.values())[1:])
+            
+            cached_result = self._get_cached_result(cache_key)
+            if cached_result is not None:
+                return cached_result
+            
+            def compute():
+                result = func(*bound.args, **bound.kwargs)
+                self._set_cached_result(cache_key, result)
+                return result
+            
+            # Les requêtes concurrentes identiques attendent un seul et même calcul
+            return self._in_flight.do(cache_key, compute)
+        return wrapper
+    return decorator
 
 class CSVClimateDataProcessor:
     def __init__(self, data_dir: str = "data"):
@@ -14,77 +85,88 @@ class CSVClimateDataProcessor:
         self.data_dir = script_dir / data_dir
         self.csv_dir = self.data_dir / "csv_optimized"
         
-        # Chemins vers les fichiers CSV optimisés
-        self.tasmin_csv = self.csv_dir / "tasmin_daily_Senegal_1960_2024_optimized.csv"
-        self.tasmax_csv = self.csv_dir / "tasmax_daily_Senegal_1960_2024_optimized.csv"
-        
-        self._tasmin_df = None
-        self._tasmax_df = None
-        
-        # Charger immédiatement toutes les données
-        if self.tasmin_csv.exists():
-            self._tasmin_df = pd.read_csv(self.tasmin_csv)
-            self._tasmin_df['time'] = pd.to_datetime(self._tasmin_df['time'])
-        else:
-            raise FileNotFoundError(f"Fichier tasmin CSV introuvable: {self.tasmin_csv}")
-        if self.tasmax_csv.exists():
-            self._tasmax_df = pd.read_csv(self.tasmax_csv)
-            self._tasmax_df['time'] = pd.to_datetime(self._tasmax_df['time'])
-        else:
-            raise FileNotFoundError(f"Fichier tasmax CSV introuvable: {self.tasmax_csv}")
-        
-        # Cache pour les résultats calculés
-        self._result_cache = {}
-        self._cache_expiry = 3600  # 1 heure
+        # Chemins vers les fichiers CSV optimisés et le magasin binaire dérivé
+        csv_paths = binary_store.default_csv_paths(self.data_dir)
+        self.tasmin_csv = csv_paths["tasmin"]
+        self.tasmax_csv = csv_paths["tasmax"]
+        self.store_dir = self.data_dir / binary_store.STORE_DIR_NAME
+        
+        # Cubes denses (jours × latitudes × longitudes), index d'agrégats
+        # (année, mois, point) et disposition par point de grille, ouverts en
+        # mémoire mappée ; le magasin est construit depuis les CSV au premier démarrage
+        store = binary_store.open_store(self.store_dir, csv_paths)
+        self._cubes: Dict[str, ClimateCube] = store.cubes
+        self._aggregates: Dict[str, AggregateIndex] = store.aggregates
+        self._localities: Dict[str, LocalityIndex] = store.localities
+        # Version des données servies (ETag HTTP), calculée une fois au chargement
+        self.dataset_version = binary_store.dataset_fingerprint(store.manifest)
+        
+        # Cache LRU borné pour les résultats calculés (CLIMATE_CACHE_MAX_MB, CLIMATE_CACHE_TTL)
+        self._result_cache = ResultCache.from_env()
+        self._in_flight = SingleFlight()
         
         # Initialiser immédiatement les métadonnées de la grille
         self._grid_info = None
         self._get_grid_info()
+        
+        # Index spatial des points de grille et des villes de référence (CSV de data/)
+        grid_cube = self._get_cube("tasmin")
+        self._spatial_index = SpatialIndex.from_csv(self.data_dir, grid_cube.latitudes, grid_cube.longitudes)
+        self._grid_points = self._spatial_index.grid_points()
+        
+        # Catalogue figé des localités (villes, régions, points et poids de grille)
+        grid_info = self._grid_info
+        self._catalogue = LocalityCatalogue.from_index(self._spatial_index, {
+            "total_points": grid_info["lat_count"] * grid_info["lon_count"],
+            "latitudes_count": grid_info["lat_count"],
+            "longitudes_count": grid_info["lon_count"],
+            "lat_range": grid_info["lat_range"],
+            "lon_range": grid_info["lon_range"]
+        })
     
     def _get_cache_key(self, method: str, *args) -> str:
-        """Génère une clé de cache unique"""
-        return f"{method}_{hash(str(args))}"
+        """Génère une clé de cache canonique (stable entre processus)"""
+        return ResultCache.make_key(method, *args)
     
     def _get_cached_result(self, cache_key: str):
         """Récupère un résultat du cache s'il est valide"""
-        if cache_key in self._result_cache:
-            result, timestamp = self._result_cache[cache_key]
-            if time.time() - timestamp < self._cache_expiry:
-                return result
-            else:
-                del self._result_cache[cache_key]
-        return None
+        return self._result_cache.get(cache_key)
     
     def _set_cached_result(self, cache_key: str, result):
         """Met en cache un résultat"""
-        self._result_cache[cache_key] = (result, time.time())
-    
-    def _load_csv_data(self, variable: str) -> pd.DataFrame:
-        """Retourne les données CSV déjà chargées (pas de chargement paresseux)"""
-        if variable == "tasmin":
-            if self._tasmin_df is None:
-                raise RuntimeError("Données tasmin non chargées - erreur d'initialisation")
-            return self._tasmin_df
-        
-        elif variable == "tasmax":
-            if self._tasmax_df is None:
-                raise RuntimeError("Données tasmax non chargées - erreur d'initialisation")
-            return self._tasmax_df
-        else:
+        self._result_cache.set(cache_key, result)
+    
+    def get_cache_stats(self) -> Dict:
+        """Statistiques du cache de résultats (succès, échecs, évictions, taille, calculs partagés)"""
+        return {**self._result_cache.stats(), **self._in_flight.stats()}
+    
+    def _get_cube(self, variable: str) -> ClimateCube:
+        """Retourne le cube déjà chargé (pas de chargement paresseux)"""
+        if variable not in ("tasmin", "tasmax"):
             raise ValueError(f"Variable inconnue: {variable}")
+        cube = self._cubes.get(variable)
+        if cube is None:
+            raise RuntimeError(f"Données {variable} non chargées - erreur d'initialisation")
+        return cube
+    
+    def _get_aggregates(self, variable: str) -> AggregateIndex:
+        """Retourne l'index d'agrégats (sommes cumulées par année) de la variable"""
+        self._get_cube(variable)
+        return self._aggregates[variable]
+    
+    def _get_locality_index(self, variable: str) -> LocalityIndex:
+        """Retourne l'index des séries par point de grille de la variable"""
+        self._get_cube(variable)
+        return self._localities[variable]
     
     def _get_grid_info(self):
         """Obtient les informations de la grille à partir des DONNÉES COMPLÈTES chargées"""
         if self._grid_info is None:
-            # Utiliser TOUTES les données complètes chargées en mémoire (pas d'échantillonnage)
-            if self._tasmin_df is None:
-                raise RuntimeError("Données tasmin non chargées - impossible de détecter la grille")
+            # La grille est celle du cube tasmin (axes triés par ordre croissant)
+            cube = self._get_cube("tasmin")
             
-            # Utiliser toutes les données pour détecter la grille complète
-            full_data = self._tasmin_df
-            
-            unique_lats = sorted(full_data['latitude'].unique())
-            unique_lons = sorted(full_data['longitude'].unique())
+            unique_lats = cube.latitudes.tolist()
+            unique_lons = cube.longitudes.tolist()
             
             self._grid_info = {
                 "latitudes": unique_lats,
@@ -97,145 +179,142 @@ class CSVClimateDataProcessor:
         
         return self._grid_info
     
+    def _grid_point(self, lat_idx: Optional[int], lon_idx: Optional[int]) -> Optional[Tuple[int, int]]:
+        """Point de grille (lat_idx, lon_idx) validé ; None si aucun indice n'est donné (toute la grille)"""
+        if lat_idx is None and lon_idx is None:
+            return None
+        n_lat, n_lon = self._spatial_index.shape
+        if lat_idx is None or lon_idx is None or not (0 <= lat_idx < n_lat and 0 <= lon_idx < n_lon):
+            raise ValueError(f"Indices de grille invalides: lat_idx={lat_idx}, lon_idx={lon_idx}")
+        return lat_idx, lon_idx
+    
     def get_available_variables(self) -> List[str]:
         """Retourne la liste des variables disponibles"""
         return ["tasmin", "tasmax"]
     
     def get_time_range(self) -> Dict[str, int]:
         """Retourne la plage temporelle disponible à partir des données chargées"""
-        # Utiliser les données déjà chargées en mémoire
-        start_year = self._tasmin_df['time'].dt.year.min()
-        end_year = self._tasmin_df['time'].dt.year.max()
+        # Utiliser l'index temporel du cube déjà chargé
+        years = self._get_cube("tasmin").available_years
+        start_year = years.min()
+        end_year = years.max()
         
         return {"start_year": int(start_year), "end_year": int(end_year)}
     
     @lru_cache(maxsize=1)
     def get_available_years(self) -> List[int]:
         """Retourne rapidement la liste de toutes les années disponibles à partir des données chargées"""
-        # Utiliser les données déjà chargées en mémoire
-        unique_years = sorted(self._tasmin_df['time'].dt.year.unique())
-        return unique_years
+        # Utiliser l'index temporel du cube déjà chargé
+        return self._get_cube("tasmin").available_years.tolist()
     
+    @cached_result("time_series")
     def get_time_series(self, variable: str, start_year: int, end_year: int) -> Dict:
         """Calcule la série temporelle moyenne annuelle - UTILISE TOUTES LES DONNÉES"""
-        cache_key = self._get_cache_key("time_series", variable, start_year, end_year)
-        
-        cached_result = self._get_cached_result(cache_key)
-        if cached_result is not None:
-            return cached_result
-        
-        # Utiliser TOUTES les données complètes chargées
-        df = self._load_csv_data(variable)
-        # Filtrer par période (utilise toutes les données de la période)
-        df_filtered = df[(df['time'].dt.year >= start_year) & (df['time'].dt.year <= end_year)].copy()
-        
-        # Ajouter une colonne année
-        df_filtered['year'] = df_filtered['time'].dt.year
-        
-        # Calculer la moyenne annuelle sur TOUTES les données
-        annual_mean = df_filtered.groupby('year')[variable].mean()
+        # Totaux annuels issus de l'index cumulé (TOUTES les données de la période)
+        years, sums, counts = self._get_aggregates(variable).national_annual(start_year, end_year)
+        keep = counts > 0
+        years, values = years[keep], sums[keep] / counts[keep]
+        points_used = int(counts.sum())
         
         result = {
             "variable": variable,
             "start_year": start_year,
             "end_year": end_year,
-            "years": annual_mean.index.tolist(),
-            "values": annual_mean.values.tolist(),
+            "years": years.tolist(),
+            "values": values.tolist(),
             "unit": "°C",
-            "data_points_used": len(df_filtered)
+            "data_points_used": points_used
         }
         
-        self._set_cached_result(cache_key, result)
         return result
     
+    @cached_result("climatology")
     def get_climatology(self, variable: str, start_year: int, end_year: int) -> Dict:
         """Calcule la climatologie mensuelle moyenne - UTILISE TOUTES LES DONNÉES"""
-        cache_key = self._get_cache_key("climatology", variable, start_year, end_year)
-        
-        cached_result = self._get_cached_result(cache_key)
-        if cached_result is not None:
-            return cached_result
-        
-        # Utiliser TOUTES les données complètes chargées
-        df = self._load_csv_data(variable)
-        # Filtrer par période (utilise toutes les données de la période)
-        df_filtered = df[(df['time'].dt.year >= start_year) & (df['time'].dt.year <= end_year)].copy()
-        
-        # Ajouter une colonne mois
-        df_filtered['month'] = df_filtered['time'].dt.month
-        
-        # Calculer la climatologie mensuelle sur TOUTES les données
-        monthly_mean = df_filtered.groupby('month')[variable].mean()
+        # Totaux mensuels par différence de deux entrées cumulées
+        period = self._get_aggregates(variable).national_period(start_year, end_year)
+        keep = period["counts"] > 0
+        months = np.arange(1, 13)[keep]
+        values = period["sums"][keep] / period["counts"][keep]
+        points_used = int(period["counts"].sum())
         
         result = {
             "variable": variable,
             "start_year": start_year,
             "end_year": end_year,
-            "months": monthly_mean.index.tolist(),
-            "values": monthly_mean.values.tolist(),
+            "months": months.tolist(),
+            "values": values.tolist(),
             "unit": "°C",
-            "data_points_used": len(df_filtered)
+            "data_points_used": points_used
         }
         
-        self._set_cached_result(cache_key, result)
         return result
     
-    def get_spatial_data(self, variable: str, month: int, start_year: int, end_year: int) -> Dict:
-        """Retourne les données spatiales pour un mois donné - UTILISE TOUTES LES DONNÉES"""
-        cache_key = self._get_cache_key("spatial", variable, month, start_year, end_year)
-        
-        cached_result = self._get_cached_result(cache_key)
-        if cached_result is not None:
-            return cached_result
-        
-        # Utiliser TOUTES les données complètes chargées
-        df = self._load_csv_data(variable)
-        
-        # Filtrer par période et mois (utilise toutes les données correspondantes)
-        df_filtered = df[
-            (df['time'].dt.year >= start_year) & 
-            (df['time'].dt.year <= end_year) &
-            (df['time'].dt.month == month)
-        ].copy()
-        
-        # Calculer la moyenne par point de grille sur TOUTES les données
-        spatial_mean = df_filtered.groupby(['latitude', 'longitude'])[variable].mean().reset_index()
-        
-        # Organiser en grille complète
+    def _spatial_field(self, variable: str, month: Union[int, Sequence[int]],
+                       start_year: int, end_year: int) -> Tuple[Tuple[int, ...], np.ndarray, np.ndarray]:
+        """Moyenne par point de grille des jours des mois retenus, depuis l'index cumulé"""
+        months = resolve_months(month=month) if isinstance(month, (int, np.integer)) else resolve_months(months=month)
+        sums, _, counts = self._get_aggregates(variable).period_sums(start_year, end_year)
+        month_idx = np.array(months) - 1
+        sums, counts = sums[month_idx].sum(axis=0), counts[month_idx].sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            field = np.where(counts > 0, sums / counts, np.nan)
+        return months, field, counts
+    
+    def _spatial_metadata(self, variable: str, months: Tuple[int, ...], start_year: int,
+                          end_year: int, counts: np.ndarray) -> Dict:
+        season = next((name for name, season_months in SEASONS.items() if season_months == months), None)
         grid_info = self._get_grid_info()
-        
-        result = {
+        return {
             "variable": variable,
-            "month": month,
+            "month": months[0] if len(months) == 1 else None,
+            "months": list(months),
+            "season": season,
             "start_year": start_year,
             "end_year": end_year,
             "latitudes": grid_info["latitudes"],
             "longitudes": grid_info["longitudes"],
-            "data": spatial_mean.to_dict('records'),
             "unit": "°C",
-            "data_points_used": len(df_filtered),
-            "grid_points_calculated": len(spatial_mean)
+            "data_points_used": int(counts.sum()),
+            "grid_points_calculated": int(np.count_nonzero(counts))
         }
-        
-        self._set_cached_result(cache_key, result)
+    
+    @cached_result("spatial")
+    def get_spatial_data(self, variable: str, month: Union[int, Sequence[int]],
+                         start_year: int, end_year: int) -> Dict:
+        """Retourne les données spatiales pour un mois ou un ensemble de mois - UTILISE TOUTES LES DONNÉES"""
+        cube = self._get_cube(variable)
+        months, field, counts = self._spatial_field(variable, month, start_year, end_year)
+        
+        # Enregistrements (latitude, longitude, valeur) des points ayant des données
+        lat_idx, lon_idx = np.nonzero(counts > 0)
+        spatial_mean = pd.DataFrame({
+            'latitude': cube.latitudes[lat_idx],
+            'longitude': cube.longitudes[lon_idx],
+            variable: field[lat_idx, lon_idx]
+        })
+        
+        result = self._spatial_metadata(variable, months, start_year, end_year, counts)
+        result["data"] = spatial_mean.to_dict('records')
         return result
     
+    @cached_result("spatial_grid")
+    def get_spatial_grid(self, variable: str, month: Union[int, Sequence[int]],
+                         start_year: int, end_year: int) -> Dict:
+        """Données spatiales en grille dense : values[i][j] pour (latitudes[i], longitudes[j]), NaN sans données"""
+        months, field, counts = self._spatial_field(variable, month, start_year, end_year)
+        result = self._spatial_metadata(variable, months, start_year, end_year, counts)
+        result["values"] = field.astype(np.float32)
+        return result
+    
+    @cached_result("statistics")
     def get_statistics(self, variable: str, start_year: int, end_year: int) -> Dict:
         """Calcule les statistiques globales - UTILISE TOUTES LES DONNÉES"""
-        cache_key = self._get_cache_key("statistics", variable, start_year, end_year)
-        
-        cached_result = self._get_cached_result(cache_key)
-        if cached_result is not None:
-            return cached_result
-        
-        # Utiliser TOUTES les données complètes chargées
-        df = self._load_csv_data(variable)
-        
-        # Filtrer par période (utilise toutes les données de la période)
-        df_filtered = df[(df['time'].dt.year >= start_year) & (df['time'].dt.year <= end_year)]
-        
-        # Calculer les statistiques sur TOUTES les données
-        stats = df_filtered[variable].describe()
+        # Statistiques exactes à partir des sommes, sommes des carrés et extrêmes agrégés
+        period = self._get_aggregates(variable).national_period(start_year, end_year)
+        mean, std, count = summarize(period["sums"], period["sumsq"], period["counts"])
+        stats = {"mean": mean, "std": std, "count": count,
+                 "min": period["min"], "max": period["max"]}
         
         result = {
             "variable": variable,
@@ -247,56 +326,347 @@ class CSVClimateDataProcessor:
             "std": float(stats['std']),
             "count": int(stats['count']),
             "unit": "°C",
-            "data_points_used": len(df_filtered)
+            "data_points_used": int(stats['count'])
+        }
+        
+        return result
+    
+    @cached_result("baseline")
+    def _get_baseline(self, variable: str, baseline_start: int, baseline_end: int) -> Baseline:
+        """Normales mensuelles par point de grille de la période de référence (calculées une fois)"""
+        return Baseline.from_aggregates(self._get_aggregates(variable), baseline_start, baseline_end)
+    
+    def _anomaly_metadata(self, variable: str, start_year: int, end_year: int, baseline: Baseline,
+                          point: Optional[Tuple[int, int]]) -> Dict:
+        result = {
+            "variable": variable,
+            "start_year": start_year,
+            "end_year": end_year,
+            "baseline": baseline.describe(),
+            "scope": "national" if point is None else "grid_point",
+            "unit": "°C"
+        }
+        if point is not None:
+            result.update(self._point_metadata(point))
+        return result
+    
+    def _point_metadata(self, point: Tuple[int, int]) -> Dict:
+        """Indices, identifiant et coordonnées d'un point de grille"""
+        grid_point = self._spatial_index.describe_point(*point)
+        return {
+            "lat_idx": grid_point["lat_idx"],
+            "lon_idx": grid_point["lon_idx"],
+            "grid_id": grid_point["grid_id"],
+            "latitude": grid_point["lat"],
+            "longitude": grid_point["lon"]
+        }
+    
+    @cached_result("anomaly_time_series")
+    def get_anomaly_time_series(self, variable: str, start_year: int, end_year: int,
+                                baseline_start: int = DEFAULT_BASELINE[0], baseline_end: int = DEFAULT_BASELINE[1],
+                                lat_idx: Optional[int] = None, lon_idx: Optional[int] = None) -> Dict:
+        """Anomalies annuelles par rapport à la normale, nationales ou en un point de grille"""
+        point = self._grid_point(lat_idx, lon_idx)
+        baseline = self._get_baseline(variable, baseline_start, baseline_end)
+        years, values = anomalies.annual_anomalies(self._get_aggregates(variable), baseline,
+                                                   start_year, end_year, point)
+        
+        result = self._anomaly_metadata(variable, start_year, end_year, baseline, point)
+        result.update({"years": years.tolist(), "values": values})
+        return result
+    
+    @cached_result("monthly_anomalies")
+    def get_monthly_anomalies(self, variable: str, start_year: int, end_year: int,
+                              baseline_start: int = DEFAULT_BASELINE[0], baseline_end: int = DEFAULT_BASELINE[1],
+                              lat_idx: Optional[int] = None, lon_idx: Optional[int] = None) -> Dict:
+        """Anomalies de chaque mois de la période par rapport à la normale du même mois"""
+        point = self._grid_point(lat_idx, lon_idx)
+        baseline = self._get_baseline(variable, baseline_start, baseline_end)
+        months, values = anomalies.monthly_anomalies(self._get_aggregates(variable), baseline,
+                                                     start_year, end_year, point)
+        
+        result = self._anomaly_metadata(variable, start_year, end_year, baseline, point)
+        result.update({
+            "periods": np.datetime_as_string(months, unit="M").tolist(),
+            "values": values,
+            "normals": baseline.normals(point)
+        })
+        return result
+    
+    @cached_result("spatial_anomalies")
+    def get_spatial_anomalies(self, variable: str, month: Union[int, Sequence[int]], start_year: int,
+                              end_year: int, baseline_start: int = DEFAULT_BASELINE[0],
+                              baseline_end: int = DEFAULT_BASELINE[1]) -> Dict:
+        """Grille dense des anomalies moyennes des mois retenus (NaN sans données)"""
+        months = resolve_months(month=month) if isinstance(month, (int, np.integer)) else resolve_months(months=month)
+        baseline = self._get_baseline(variable, baseline_start, baseline_end)
+        field, counts = anomalies.spatial_anomalies(self._get_aggregates(variable), baseline,
+                                                    months, start_year, end_year)
+        
+        result = self._spatial_metadata(variable, months, start_year, end_year, counts)
+        result["baseline"] = baseline.describe()
+        result["values"] = field.astype(np.float32)
+        return result
+    
+    @cached_result("trend_map")
+    def get_trend_map(self, variable: str, start_year: int, end_year: int, alpha: float = 0.05) -> Dict:
+        """Tendance linéaire (°C/décennie), erreur type et significativité de chaque point de grille"""
+        if not 0 < alpha < 1:
+            raise ValueError("Le seuil alpha doit être compris entre 0 et 1")
+        trend = trends.linear_trends(self._get_aggregates(variable), start_year, end_year, alpha)
+        grid_info = self._get_grid_info()
+        slope = trend["slope"] * 10
+        # Fraction sur les seuls points ayant une pente (hors mer et points sans données)
+        estimated = np.isfinite(slope)
+        
+        return {
+            "variable": variable,
+            "start_year": start_year,
+            "end_year": end_year,
+            "alpha": alpha,
+            "latitudes": grid_info["latitudes"],
+            "longitudes": grid_info["longitudes"],
+            "unit": "°C/décennie",
+            "slope": slope.astype(np.float32),
+            "stderr": (trend["stderr"] * 10).astype(np.float32),
+            "significant": trend["significant"],
+            "years_used": trend["years_used"],
+            "mean_slope": float(np.nanmean(slope)) if estimated.any() else None,
+            "significant_fraction": float(trend["significant"][estimated].mean()) if estimated.any() else None
+        }
+    
+    @cached_result("percentile_thresholds")
+    def _get_percentile_thresholds(self, variable: str, baseline_start: int, baseline_end: int,
+                                   q: float) -> np.ndarray:
+        """Centile q par jour calendaire et point de grille (365, lat, lon) sur la période de base"""
+        return extreme_indices.percentile_thresholds(self._get_cube(variable), baseline_start, baseline_end, q)
+    
+    @cached_result("extreme_indices")
+    def _get_extreme_indices(self, baseline_start: int, baseline_end: int) -> ExtremeIndices:
+        """Indices ETCCDI de toutes les années et de tous les points (calculés une fois par période de base)"""
+        if baseline_start > baseline_end:
+            raise ValueError("L'année de début de la période de base doit être <= année de fin")
+        tx90 = self._get_percentile_thresholds("tasmax", baseline_start, baseline_end, 90.0)
+        tn10 = self._get_percentile_thresholds("tasmin", baseline_start, baseline_end, 10.0)
+        return extreme_indices.compute_indices(self._get_cube("tasmax"), self._get_cube("tasmin"), tx90, tn10)
+    
+    def _index_period(self, index: str, start_year: int, end_year: int, baseline_start: int,
+                      baseline_end: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Années et valeurs (n, lat, lon) d'un indice sur la période"""
+        if index not in INDICES:
+            raise ValueError(f"Indice inconnu: {index} (indices: {', '.join(INDICES)})")
+        table = self._get_extreme_indices(baseline_start, baseline_end)
+        i0 = int(np.searchsorted(table.years, start_year, side="left"))
+        i1 = int(np.searchsorted(table.years, end_year, side="right"))
+        if i1 <= i0:
+            raise ValueError(f"Aucune donnée pour la période {start_year}-{end_year}")
+        return table.years[i0:i1], table.values[index][i0:i1]
+    
+    def _index_metadata(self, index: str, start_year: int, end_year: int, baseline_start: int,
+                        baseline_end: int) -> Dict:
+        definition = INDICES[index]
+        return {
+            "index": index,
+            "description": definition.description,
+            "variables": list(definition.variables),
+            "start_year": start_year,
+            "end_year": end_year,
+            "baseline": {"start_year": baseline_start, "end_year": baseline_end},
+            "unit": definition.unit
         }
+    
+    def get_extreme_indices_catalogue(self) -> Dict:
+        """Liste des indices ETCCDI disponibles"""
+        return {
+            "indices": [definition._asdict() for definition in INDICES.values()],
+            "default_baseline": {"start_year": DEFAULT_BASELINE[0], "end_year": DEFAULT_BASELINE[1]}
+        }
+    
+    @cached_result("index_time_series")
+    def get_index_time_series(self, index: str, start_year: int, end_year: int,
+                              baseline_start: int = DEFAULT_BASELINE[0], baseline_end: int = DEFAULT_BASELINE[1],
+                              lat_idx: Optional[int] = None, lon_idx: Optional[int] = None) -> Dict:
+        """Série annuelle d'un indice : moyenne sur la grille ou valeur d'un point de grille"""
+        point = self._grid_point(lat_idx, lon_idx)
+        years, values = self._index_period(index, start_year, end_year, baseline_start, baseline_end)
+        if point is None:
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", message="Mean of empty slice")
+                series = np.nanmean(values.reshape(len(years), -1), axis=1)
+        else:
+            series = values[:, point[0], point[1]]
         
-        self._set_cached_result(cache_key, result)
+        result = self._index_metadata(index, start_year, end_year, baseline_start, baseline_end)
+        result["scope"] = "national" if point is None else "grid_point"
+        if point is not None:
+            result.update(self._point_metadata(point))
+        result.update({"years": years.tolist(), "values": series})
         return result
     
-    def export_data_csv(self, variable: str, start_year: int, end_year: int) -> str:
-        """Exporte TOUTES les données CSV pour la période demandée"""
-        # Utiliser TOUTES les données complètes chargées
-        df = self._load_csv_data(variable)
+    @cached_result("index_map")
+    def get_index_map(self, index: str, start_year: int, end_year: int,
+                      baseline_start: int = DEFAULT_BASELINE[0], baseline_end: int = DEFAULT_BASELINE[1]) -> Dict:
+        """Grille dense de la moyenne annuelle d'un indice sur la période (NaN sans données)"""
+        years, values = self._index_period(index, start_year, end_year, baseline_start, baseline_end)
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="Mean of empty slice")
+            field = np.nanmean(values, axis=0)
+        grid_info = self._get_grid_info()
         
-        # Filtrer par période (utilise toutes les données de la période)
-        df_filtered = df[(df['time'].dt.year >= start_year) & (df['time'].dt.year <= end_year)]
+        result = self._index_metadata(index, start_year, end_year, baseline_start, baseline_end)
+        result.update({
+            "years_used": len(years),
+            "latitudes": grid_info["latitudes"],
+            "longitudes": grid_info["longitudes"],
+            "values": field.astype(np.float32)
+        })
+        return result
+    
+    @cached_result("spells")
+    def _get_spells(self, variable: str, threshold_type: str, threshold: float, min_days: int,
+                    baseline_start: int, baseline_end: int) -> SpellTable:
+        """Séquences de jours au-dessus du seuil, pour toutes les années et tous les points"""
+        if threshold_type not in THRESHOLD_TYPES:
+            raise ValueError(f"Type de seuil inconnu: {threshold_type} (types: {', '.join(THRESHOLD_TYPES)})")
+        if threshold_type == "percentile":
+            if not 0 < threshold < 100:
+                raise ValueError("Le centile doit être compris entre 0 et 100")
+            limit = self._get_percentile_thresholds(variable, baseline_start, baseline_end, float(threshold))
+        else:
+            limit = float(threshold)
+        return spells.compute_spells(self._get_cube(variable), limit, min_days)
+    
+    def _spell_period(self, variable: str, start_year: int, end_year: int, threshold_type: str,
+                      threshold: float, min_days: int, baseline_start: int,
+                      baseline_end: int) -> Tuple[slice, SpellTable, Dict]:
+        """Tranche d'années de la période, table des séquences et métadonnées communes"""
+        table = self._get_spells(variable, threshold_type, threshold, min_days, baseline_start, baseline_end)
+        i0 = int(np.searchsorted(table.years, start_year, side="left"))
+        i1 = int(np.searchsorted(table.years, end_year, side="right"))
+        if i1 <= i0:
+            raise ValueError(f"Aucune donnée pour la période {start_year}-{end_year}")
+        
+        metadata = {
+            "variable": variable,
+            "start_year": start_year,
+            "end_year": end_year,
+            "threshold": {"type": threshold_type, "value": threshold,
+                          "unit": "°C" if threshold_type == "absolute" else "centile"},
+            "min_days": min_days,
+            "unit": "jours"
+        }
+        if threshold_type == "percentile":
+            metadata["baseline"] = {"start_year": baseline_start, "end_year": baseline_end}
+        return slice(i0, i1), table, metadata
+    
+    @cached_result("spell_map")
+    def get_spell_map(self, variable: str, start_year: int, end_year: int,
+                      threshold_type: str = "percentile", threshold: float = 90.0,
+                      min_days: int = DEFAULT_MIN_DAYS, baseline_start: int = DEFAULT_BASELINE[0],
+                      baseline_end: int = DEFAULT_BASELINE[1]) -> Dict:
+        """Grilles des séquences sur la période : nombre, durée maximale et jours en séquence"""
+        period, table, result = self._spell_period(variable, start_year, end_year, threshold_type,
+                                                   threshold, min_days, baseline_start, baseline_end)
+        count, longest, total = table.count[period], table.max_duration[period], table.total_days[period]
+        has_data = ~np.isnan(total).all(axis=0)
+        grid_info = self._get_grid_info()
         
-        # Créer le fichier de sortie
-        output_file = self.data_dir / f"{variable}_{start_year}_{end_year}_export.csv"
-        df_filtered.to_csv(output_file, index=False)
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="All-NaN slice encountered")
+            warnings.filterwarnings("ignore", message="Mean of empty slice")
+            result.update({
+                "years_used": period.stop - period.start,
+                "latitudes": grid_info["latitudes"],
+                "longitudes": grid_info["longitudes"],
+                "count": np.where(has_data, np.nansum(count, axis=0), np.nan).astype(np.float32),
+                "max_duration": np.nanmax(longest, axis=0),
+                "total_days": np.where(has_data, np.nansum(total, axis=0), np.nan).astype(np.float32),
+                "days_per_year": np.nanmean(total, axis=0)
+            })
+        return result
+    
+    @cached_result("spell_series")
+    def get_spell_series(self, variable: str, lat_idx: int, lon_idx: int, start_year: int, end_year: int,
+                         threshold_type: str = "percentile", threshold: float = 90.0,
+                         min_days: int = DEFAULT_MIN_DAYS, baseline_start: int = DEFAULT_BASELINE[0],
+                         baseline_end: int = DEFAULT_BASELINE[1]) -> Dict:
+        """Séquences annuelles en un point de grille : nombre, durée maximale et jours en séquence"""
+        point = self._grid_point(lat_idx, lon_idx)
+        if point is None:
+            raise ValueError("lat_idx et lon_idx sont requis pour une série de séquences")
+        period, table, result = self._spell_period(variable, start_year, end_year, threshold_type,
+                                                   threshold, min_days, baseline_start, baseline_end)
+        result.update(self._point_metadata(point))
+        result.update({
+            "years": table.years[period].tolist(),
+            "count": table.count[period, lat_idx, lon_idx],
+            "max_duration": table.max_duration[period, lat_idx, lon_idx],
+            "total_days": table.total_days[period, lat_idx, lon_idx]
+        })
+        return result
+    
+    def _export_cube(self, variable: str, start_year: int, end_year: int) -> ClimateCube:
+        """Cube à exporter ; une période sans données donnerait un fichier vide et invalide"""
+        cube = self._get_cube(variable)
+        sl = cube.time_slice(start_year, end_year)
+        if sl.stop <= sl.start:
+            raise ValueError(f"Aucune donnée pour la période {start_year}-{end_year}")
+        return cube
+    
+    def export_data_csv(self, variable: str, start_year: int, end_year: int,
+                        days_per_chunk: int = 31) -> Iterator[str]:
+        """Exporte TOUTES les données CSV de la période sous forme de flux de blocs de texte"""
+        # Validation immédiate : les erreurs surviennent avant l'envoi des en-têtes HTTP
+        cube = self._export_cube(variable, start_year, end_year)
+        
+        def generate() -> Iterator[str]:
+            # Un bloc de jours à la fois : mémoire constante, aucun fichier temporaire
+            header = True
+            for frame in cube.iter_frames(start_year, end_year, days_per_chunk):
+                yield frame.to_csv(index=False, header=header)
+                header = False
+        
+        return generate()
+    
+    def export_data_stream(self, variable: str, start_year: int, end_year: int,
+                           format_type: str = "csv") -> Iterator[Union[str, bytes]]:
+        """Exporte les données de la période dans le format demandé (csv, csv.gz, parquet, netcdf)"""
+        if format_type not in exporters.EXPORT_FORMATS:
+            raise ValueError(f"Format {format_type} non supporté (formats: {', '.join(exporters.EXPORT_FORMATS)})")
+        cube = self._export_cube(variable, start_year, end_year)
         
-        return str(output_file)
+        if format_type == "csv":
+            return self.export_data_csv(variable, start_year, end_year)
+        if format_type == "csv.gz":
+            return exporters.gzip_stream(self.export_data_csv(variable, start_year, end_year))
+        if format_type == "parquet":
+            # Un groupe de lignes Parquet par année de données
+            return exporters.parquet_stream(cube.iter_frames(start_year, end_year, days_per_chunk=366))
+        return exporters.netcdf_stream(cube, start_year, end_year)
     
     def get_locality_data_csv(self, variable: str, lat_idx: int, lon_idx: int, 
                              start_year: int, end_year: int) -> str:
         """Récupère TOUTES les données pour une localité spécifique au format CSV"""
-        cache_key = self._get_cache_key("locality_csv", variable, lat_idx, lon_idx, start_year, end_year)
-        
-        # Utiliser TOUTES les données complètes chargées
-        df = self._load_csv_data(variable)
+        locality_index = self._get_locality_index(variable)
         
         # Obtenir les coordonnées de la grille
         grid_info = self._get_grid_info()
-        
-        if lat_idx >= len(grid_info["latitudes"]) or lon_idx >= len(grid_info["longitudes"]):
-            raise ValueError(f"Indices de grille invalides: lat_idx={lat_idx}, lon_idx={lon_idx}")
-        
-        target_lat = grid_info["latitudes"][lat_idx]
-        target_lon = grid_info["longitudes"][lon_idx]
-        
-        # Filtrer par localité et période (utilise toutes les données correspondantes)
-        locality_data = df[
-            (df['latitude'] == target_lat) & 
-            (df['longitude'] == target_lon) &
-            (df['time'].dt.year >= start_year) & 
-            (df['time'].dt.year <= end_year)
-        ].copy()
+        self._grid_point(lat_idx, lon_idx)
+        
+        # Série du point de grille : tranche contiguë, sans parcours des autres points
+        times, values = locality_index.point_series(lat_idx, lon_idx, start_year, end_year)
+        valid = ~np.isnan(values)
+        locality_data = pd.DataFrame({
+            'time': pd.to_datetime(times[valid]),
+            'latitude': grid_info["latitudes"][lat_idx],
+            'longitude': grid_info["longitudes"][lon_idx],
+            variable: values[valid]
+        })
         
         if locality_data.empty:
             raise ValueError(f"Aucune donnée trouvée pour lat_idx={lat_idx}, lon_idx={lon_idx}")
         
-        
-        # Formater pour l'export CSV
+        # Formatage texte réservé au téléchargement CSV
         locality_data['date'] = locality_data['time'].dt.strftime('%Y-%m-%d')
         locality_data['year'] = locality_data['time'].dt.year
         locality_data['month'] = locality_data['time'].dt.month
@@ -311,70 +681,269 @@ class CSVClimateDataProcessor:
         
         return csv_string
     
+    @cached_result("locality_series")
+    def get_locality_series(self, variable: str, lat_idx: int, lon_idx: int,
+                            start_year: int, end_year: int, frequency: str = "annual",
+                            points: Optional[int] = None, method: str = "lttb") -> Dict:
+        """Série d'un point de grille (annuelle, mensuelle ou journalière) calculée sur les tableaux
+        
+        Avec `points`, la série est réduite côté serveur à au plus `points` valeurs
+        (méthode "lttb" ou "minmax") pour les graphiques zoomables.
+        """
+        locality_index = self._get_locality_index(variable)
+        self._grid_point(lat_idx, lon_idx)
+        if frequency not in SERIES_FREQUENCIES:
+            raise ValueError(f"Fréquence inconnue: {frequency} (fréquences: {', '.join(SERIES_FREQUENCIES)})")
+        
+        counts = None
+        if frequency == "annual":
+            periods, values, counts = locality_index.annual_means(lat_idx, lon_idx, start_year, end_year)
+        elif frequency == "monthly":
+            months, values, counts = locality_index.monthly_means(lat_idx, lon_idx, start_year, end_year)
+            periods = np.datetime_as_string(months, unit="M")
+        else:
+            times, values = locality_index.point_series(lat_idx, lon_idx, start_year, end_year)
+            periods = np.datetime_as_string(times, unit="D")
+        
+        total_points = len(values)
+        downsampled = False
+        if points is not None:
+            keep = downsample(values, points, method)
+            # Les NaN sont toujours retirés : réduction effective seulement sous ce nombre
+            downsampled = len(keep) < np.count_nonzero(~np.isnan(values))
+            periods, values = periods[keep], values[keep]
+            if counts is not None:
+                counts = counts[keep]
+        
+        point = self._spatial_index.describe_point(lat_idx, lon_idx)
+        result = {
+            "variable": variable,
+            "lat_idx": lat_idx,
+            "lon_idx": lon_idx,
+            "grid_id": point["grid_id"],
+            "latitude": point["lat"],
+            "longitude": point["lon"],
+            "start_year": start_year,
+            "end_year": end_year,
+            "frequency": frequency,
+            "periods": periods.tolist(),
+            "values": np.asarray(values),
+            "total_points": total_points,
+            "downsampling": method if downsampled else None,
+            "unit": "°C"
+        }
+        if counts is not None:
+            result["counts"] = counts
+        return result
+    
     def find_nearest_grid_point(self, target_lat: float, target_lon: float) -> Dict:
         """Trouve le point de grille le plus proche des coordonnées données"""
-        grid_info = self._get_grid_info()
-        
-        # Convertir en arrays numpy pour le calcul
-        lats = np.array(grid_info["latitudes"])
-        lons = np.array(grid_info["longitudes"])
-        
-        # Trouver les indices les plus proches
-        lat_idx = np.argmin(np.abs(lats - target_lat))
-        lon_idx = np.argmin(np.abs(lons - target_lon))
-        
-        # Calculer la distance
-        actual_lat = lats[lat_idx]
-        actual_lon = lons[lon_idx]
-        distance = np.sqrt((target_lat - actual_lat)**2 + (target_lon - actual_lon)**2) * 111  # km
+        return self.find_nearest_grid_points([target_lat], [target_lon])[0]
+    
+    def find_nearest_grid_points(self, target_lats: Sequence[float], target_lons: Sequence[float]) -> List[Dict]:
+        """Points de grille les plus proches d'un lot de coordonnées (distance haversine)"""
+        match = self._spatial_index.nearest(target_lats, target_lons)
+        results = []
+        for k, (target_lat, target_lon) in enumerate(zip(target_lats, target_lons)):
+            point = self._spatial_index.describe_point(match["lat_idx"][k], match["lon_idx"][k])
+            results.append({
+                "lat_idx": point["lat_idx"],
+                "lon_idx": point["lon_idx"],
+                "grid_id": point["grid_id"],
+                "grid_latitude": point["lat"],
+                "grid_longitude": point["lon"],
+                "distance_km": float(match["distance_km"][k]),
+                "target_latitude": target_lat,
+                "target_longitude": target_lon
+            })
+        return results
+    
+    def find_grid_points_within(self, target_lat: float, target_lon: float, radius_km: float) -> List[Dict]:
+        """Points de grille à moins de radius_km des coordonnées, du plus proche au plus lointain"""
+        match = self._spatial_index.within_radius(target_lat, target_lon, radius_km)
+        return [
+            {**self._spatial_index.describe_point(lat_idx, lon_idx), "distance_km": float(distance)}
+            for lat_idx, lon_idx, distance in zip(match["lat_idx"], match["lon_idx"], match["distance_km"])
+        ]
+    
+    def find_locality_by_coordinates(self, lat: float, lon: float, tolerance: float = 0.5) -> Optional[Dict]:
+        """Point de grille le plus proche, ou None s'il est à plus de `tolerance` degrés"""
+        point = self._spatial_index.find(lat, lon, tolerance)
+        if point is None:
+            return None
+        return {**point, "target_latitude": lat, "target_longitude": lon}
+    
+    @cached_result("interpolated_points")
+    def get_interpolated_points(self, variable: str, lats: Sequence[float], lons: Sequence[float],
+                                start_year: int, end_year: int) -> Dict:
+        """Séries annuelles et statistiques interpolées (bilinéaire) en des coordonnées quelconques"""
+        locality_index = self._get_locality_index(variable)
+        corners, weights = self._spatial_index.bilinear_weights(lats, lons)
+        
+        # Matrice de poids (n_points, n_sommets) sur les sommets utilisés : une seule
+        # réduction pondérée (produit matriciel) pour tous les points et tous les jours
+        vertices, inverse = np.unique(corners, return_inverse=True)
+        weight_matrix = np.zeros((len(corners), len(vertices)))
+        np.add.at(weight_matrix, (np.arange(len(corners))[:, None], inverse.reshape(corners.shape)), weights)
+        
+        o0, o1 = locality_index.year_range(start_year, end_year)
+        vertex_series = np.asarray(locality_index.series[vertices, o0:o1], dtype=np.float64)
+        valid = ~np.isnan(vertex_series)
+        
+        # Sommets sans donnée un jour donné (océan) : poids renormalisés sur les autres
+        with np.errstate(invalid='ignore', divide='ignore'):
+            daily = (weight_matrix @ np.where(valid, vertex_series, 0.0)) / (weight_matrix @ valid)
+        
+        # Moyennes annuelles par réduction sur les décalages d'années
+        i0 = int(np.searchsorted(locality_index.years, start_year, side="left"))
+        i1 = int(np.searchsorted(locality_index.years, end_year, side="right"))
+        years = locality_index.years[i0:max(i0, i1)]
+        daily_valid = ~np.isnan(daily)
+        daily_filled = np.where(daily_valid, daily, 0.0)
+        if len(years):
+            offsets = locality_index.year_offsets[i0:i1] - o0
+            annual_sums = np.add.reduceat(daily_filled, offsets, axis=1)
+            annual_counts = np.add.reduceat(daily_valid, offsets, axis=1)
+        else:
+            annual_sums = annual_counts = np.zeros((len(corners), 0))
+        
+        counts = daily_valid.sum(axis=1)
+        sums = daily_filled.sum(axis=1)
+        sumsq = (daily_filled ** 2).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            annual = np.where(annual_counts > 0, annual_sums / annual_counts, np.nan)
+            means = np.where(counts > 0, sums / counts, np.nan)
+            stds = np.where(counts > 1, np.sqrt(np.maximum((sumsq - sums * means) / (counts - 1), 0.0)), np.nan)
+        mins = np.fmin.reduce(daily, axis=1) if daily.shape[1] else np.full(len(corners), np.nan)
+        maxs = np.fmax.reduce(daily, axis=1) if daily.shape[1] else np.full(len(corners), np.nan)
+        
+        n_lon = len(self._spatial_index.longitudes)
+        points = []
+        for k, (lat, lon) in enumerate(zip(lats, lons)):
+            grid_points = [
+                {**self._spatial_index.describe_point(vertex // n_lon, vertex % n_lon), "weight": float(weight)}
+                for vertex, weight in zip(corners[k], weights[k]) if weight > 0
+            ]
+            points.append({
+                "latitude": lat,
+                "longitude": lon,
+                "grid_points": grid_points,
+                "values": annual[k],
+                "mean": float(means[k]),
+                "std": float(stds[k]),
+                "min": float(mins[k]),
+                "max": float(maxs[k]),
+                "count": int(counts[k])
+            })
         
         return {
-            "lat_idx": int(lat_idx),
-            "lon_idx": int(lon_idx),
-            "grid_latitude": float(actual_lat),
-            "grid_longitude": float(actual_lon),
-            "distance_km": float(distance),
-            "target_latitude": target_lat,
-            "target_longitude": target_lon
+            "variable": variable,
+            "start_year": start_year,
+            "end_year": end_year,
+            "method": "bilinear",
+            "years": years.tolist(),
+            "points": points,
+            "unit": "°C"
+        }
+    
+    def get_cities(self) -> List[Dict]:
+        """Villes de référence (senegal_cities.csv) avec leur point de grille le plus proche"""
+        return [city.to_dict() for city in self._catalogue]
+    
+    def get_grid_points(self) -> List[Dict]:
+        """Tous les points de grille (lat, lon, lat_idx, lon_idx, grid_id)"""
+        return self._grid_points
+    
+    @cached_result("locality_statistics")
+    def get_locality_statistics(self, variable: str, lat_idx: int, lon_idx: int,
+                                start_year: int, end_year: int) -> Dict:
+        """Statistiques d'un point de grille sur la période, depuis l'index cumulé"""
+        self._grid_point(lat_idx, lon_idx)
+        aggregates = self._get_aggregates(variable)
+        sums, sumsq, counts = aggregates.period_sums(start_year, end_year)
+        mins, maxs = aggregates.period_extremes(start_year, end_year)
+        mean, std, count = summarize(sums[:, lat_idx, lon_idx], sumsq[:, lat_idx, lon_idx],
+                                     counts[:, lat_idx, lon_idx])
+        
+        point = self._spatial_index.describe_point(lat_idx, lon_idx)
+        return {
+            "variable": variable,
+            "lat_idx": lat_idx,
+            "lon_idx": lon_idx,
+            "grid_id": point["grid_id"],
+            "latitude": point["lat"],
+            "longitude": point["lon"],
+            "start_year": start_year,
+            "end_year": end_year,
+            "mean": mean,
+            "std": std,
+            "min": float(np.fmin.reduce(mins[:, lat_idx, lon_idx])),
+            "max": float(np.fmax.reduce(maxs[:, lat_idx, lon_idx])),
+            "count": count,
+            "unit": "°C"
         }
     
     def get_available_localities(self) -> Dict:
-        """Retourne les informations sur les localités disponibles"""
+        """Retourne les informations sur les localités disponibles (catalogue construit au chargement)"""
+        return self._catalogue.to_dict()
+
+    def resolve_localities(self, cities: Optional[List[str]] = None,
+                           points: Optional[List[Tuple[int, int]]] = None) -> List[Dict]:
+        """Résout des noms de villes et des indices de grille en localités (toutes les villes par défaut)"""
         grid_info = self._get_grid_info()
-        
-        # Villes principales du Sénégal avec leurs coordonnées
-        cities = [
-            {"name": "Dakar", "latitude": 14.7167, "longitude": -17.4677},
-            {"name": "Thiès", "latitude": 14.7886, "longitude": -16.9260},
-            {"name": "Kaolack", "latitude": 14.1612, "longitude": -16.0734},
-            {"name": "Saint-Louis", "latitude": 16.0469, "longitude": -16.4814},
-            {"name": "Ziguinchor", "latitude": 12.5681, "longitude": -16.2736},
-            {"name": "Diourbel", "latitude": 14.6594, "longitude": -16.2353},
-            {"name": "Tambacounda", "latitude": 13.7671, "longitude": -13.6681},
-            {"name": "Kolda", "latitude": 12.8939, "longitude": -14.9406},
-            {"name": "Fatick", "latitude": 14.3341, "longitude": -16.4069},
-            {"name": "Louga", "latitude": 15.6181, "longitude": -16.2463},
-            {"name": "Matam", "latitude": 15.6554, "longitude": -13.2550},
-            {"name": "Kaffrine", "latitude": 14.1058, "longitude": -15.5500},
-            {"name": "Kédougou", "latitude": 12.5601, "longitude": -12.1756},
-            {"name": "Sédhiou", "latitude": 12.7081, "longitude": -15.5569},
-            {"name": "Mbour", "latitude": 14.4198, "longitude": -16.9613}
-        ]
-        
-        # Ajouter les informations de grille pour chaque ville
-        for city in cities:
-            grid_point = self.find_nearest_grid_point(city["latitude"], city["longitude"])
-            city.update(grid_point)
+        if not cities and not points:
+            cities = [city.name for city in self._catalogue]
+        
+        localities = []
+        for name in cities or []:
+            city = self._catalogue.get(name)
+            if city is None:
+                raise ValueError(f"Ville inconnue: {name}")
+            localities.append({"name": city.name, "lat_idx": city.lat_idx, "lon_idx": city.lon_idx})
+        
+        for lat_idx, lon_idx in points or []:
+            if not (0 <= lat_idx < grid_info["lat_count"] and 0 <= lon_idx < grid_info["lon_count"]):
+                raise ValueError(f"Indices de grille invalides: lat_idx={lat_idx}, lon_idx={lon_idx}")
+            localities.append({"name": f"P_{lat_idx:02d}_{lon_idx:02d}", "lat_idx": lat_idx, "lon_idx": lon_idx})
+        
+        return localities
+    
+    @cached_result("localities_time_series")
+    def get_localities_time_series(self, variable: str, localities: List[Dict],
+                                   start_year: int, end_year: int) -> Dict:
+        """Séries annuelles de plusieurs localités en un seul passage vectorisé sur l'index"""
+        grid_info = self._get_grid_info()
+        years, sums, counts = self._get_aggregates(variable).annual_sums(start_year, end_year)
+        
+        # Sélection simultanée de tous les points : (n_années, n_localités)
+        lat_idx = np.array([loc["lat_idx"] for loc in localities], dtype=np.intp)
+        lon_idx = np.array([loc["lon_idx"] for loc in localities], dtype=np.intp)
+        point_sums = sums[:, lat_idx, lon_idx]
+        point_counts = counts[:, lat_idx, lon_idx]
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            annual = np.where(point_counts > 0, point_sums / point_counts, np.nan)
+            period_mean = point_sums.sum(axis=0) / point_counts.sum(axis=0)
+        
+        series = []
+        for k, loc in enumerate(localities):
+            series.append({
+                "name": loc["name"],
+                "lat_idx": int(lat_idx[k]),
+                "lon_idx": int(lon_idx[k]),
+                "latitude": grid_info["latitudes"][lat_idx[k]],
+                "longitude": grid_info["longitudes"][lon_idx[k]],
+                "mean": None if np.isnan(period_mean[k]) else float(period_mean[k]),
+                "values": [None if np.isnan(v) else float(v) for v in annual[:, k]]
+            })
         
         return {
-            "cities": cities,
-            "grid_summary": {
-                "total_points": grid_info["lat_count"] * grid_info["lon_count"],
-                "latitudes_count": grid_info["lat_count"],
-                "longitudes_count": grid_info["lon_count"],
-                "lat_range": grid_info["lat_range"],
-                "lon_range": grid_info["lon_range"]
-            }
+            "variable": variable,
+            "start_year": start_year,
+            "end_year": end_year,
+            "years": years.tolist(),
+            "localities": series,
+            "unit": "°C"
         }
 
 # Classe de compatibilité pour maintenir l'interface existante
@@ -384,25 +953,21 @@ class ClimateDataProcessor(CSVClimateDataProcessor):
     def __init__(self, data_dir: str = "data"):
         super().__init__(data_dir)
     
-    def export_data(self, variable: str, start_year: int, end_year: int, format_type: str = "csv") -> str:
+    def export_data(self, variable: str, start_year: int, end_year: int,
+                    format_type: str = "csv") -> Iterator[Union[str, bytes]]:
         """Export compatible avec l'ancienne interface"""
-        if format_type == "csv":
-            return self.export_data_csv(variable, start_year, end_year)
-        else:
-            raise ValueError(f"Format {format_type} non supporté en mode CSV optimisé")
+        return self.export_data_stream(variable, start_year, end_year, format_type)
     
+    @cached_result("locality_time_series")
     def get_locality_time_series(self, variable: str, lat_idx: int, lon_idx: int, 
                                 start_year: int, end_year: int) -> Dict:
         """Interface de compatibilité pour les séries temporelles de localité"""
-        # Utiliser les données CSV pour calculer la série temporelle
-        csv_data = self.get_locality_data_csv(variable, lat_idx, lon_idx, start_year, end_year)
-        
-        # Parser le CSV pour extraire les données
-        import io
-        df = pd.read_csv(io.StringIO(csv_data))
-        
-        # Calculer la moyenne annuelle
-        annual_mean = df.groupby('year')[variable].mean()
+        self._grid_point(lat_idx, lon_idx)
+        # Moyennes annuelles calculées directement sur la série du point (sans passage par CSV)
+        series = self.get_locality_series(variable, lat_idx, lon_idx, start_year, end_year, "annual")
+        has_data = series["counts"] > 0
+        if not has_data.any():
+            raise ValueError(f"Aucune donnée trouvée pour lat_idx={lat_idx}, lon_idx={lon_idx}")
         
         grid_info = self._get_grid_info()
         
@@ -414,7 +979,7 @@ class ClimateDataProcessor(CSVClimateDataProcessor):
             "longitude": grid_info["longitudes"][lon_idx],
             "start_year": start_year,
             "end_year": end_year,
-            "years": annual_mean.index.tolist(),
-            "values": annual_mean.values.tolist(),
+            "years": np.asarray(series["periods"])[has_data].tolist(),
+            "values": series["values"][has_data].tolist(),
             "unit": "°C"
-        }
\ No newline at end of file
+        }
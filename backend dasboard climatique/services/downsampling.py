@@ -0,0 +1,76 @@
+"""
+Réduction du nombre de points d'une série pour les graphiques.
+
+- lttb   : Largest-Triangle-Three-Buckets, conserve la forme visuelle de la courbe
+- minmax : minimum et maximum de chaque paquet, conserve les extrêmes
+
+Les fonctions retournent les indices (croissants) des points retenus, pour
+extraire à la fois les dates et les valeurs. Les valeurs manquantes (NaN)
+sont ignorées ; leur position reste visible comme un trou entre deux points.
+"""
+import numpy as np
+
+DOWNSAMPLING_METHODS = ("lttb", "minmax")
+
+# En dessous, ni triangle (lttb) ni paquet min/max n'a de sens
+MIN_POINTS = 3
+
+
+def lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices retenus par Largest-Triangle-Three-Buckets (premier et dernier points inclus)"""
+    valid = np.flatnonzero(~np.isnan(values))
+    n = len(valid)
+    if n_out >= n:
+        return valid
+
+    x = valid.astype(np.float64)
+    y = values[valid].astype(np.float64)
+
+    # n_out - 2 paquets entre le premier et le dernier point, chacun non vide (pas >= 1)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # Troisième sommet du triangle : moyenne du paquet suivant (dernier point pour le dernier paquet)
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        area = np.abs((x[a] - next_x[b]) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (next_y[b] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[b + 1] = a
+    return valid[selected]
+
+
+def minmax_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices du minimum et du maximum de chacun des n_out // 2 paquets"""
+    valid = np.flatnonzero(~np.isnan(values))
+    n = len(valid)
+    if n_out >= n:
+        return valid
+
+    y = values[valid]
+    n_buckets = n_out // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.intp)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    # Tri par paquet puis par valeur : extrêmes en tête et en fin de chaque paquet
+    order = np.lexsort((y, bucket))
+    picked = np.union1d(order[edges[:-1]], order[edges[1:] - 1])
+    return valid[picked]
+
+
+def downsample(values: np.ndarray, n_out: int, method: str = "lttb") -> np.ndarray:
+    """Indices des points à conserver pour représenter `values` avec au plus n_out points"""
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Méthode de réduction inconnue: {method} (méthodes: {', '.join(DOWNSAMPLING_METHODS)})")
+    if n_out < MIN_POINTS:
+        raise ValueError(f"Au moins {MIN_POINTS} points sont nécessaires pour réduire une série")
+    values = np.asarray(values)
+    if method == "lttb":
+        return lttb_indices(values, n_out)
+    return minmax_indices(values, n_out)
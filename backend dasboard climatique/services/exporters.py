@@ -0,0 +1,159 @@
+"""
+Formats d'export des données climatiques, produits par blocs depuis les cubes.
+
+- csv      : texte brut
+- csv.gz   : CSV compressé gzip à la volée
+- parquet  : colonnes compressées (zstd), un groupe de lignes par bloc de jours (pyarrow)
+- netcdf   : NetCDF4 compressé et découpé en blocs (netCDF4)
+"""
+import shutil
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from .climate_cube import ClimateCube
+
+# format -> (type MIME, extension de fichier)
+EXPORT_FORMATS: Dict[str, tuple] = {
+    "csv": ("text/csv", "csv"),
+    "csv.gz": ("application/gzip", "csv.gz"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "netcdf": ("application/x-netcdf", "nc"),
+}
+
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+def gzip_stream(chunks: Iterable[str], level: int = 6) -> Iterator[bytes]:
+    """Compresse en gzip un flux de blocs de texte, bloc par bloc"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 : en-tête gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _ChunkSink:
+    """Fichier en écriture seule dont le contenu est vidé au fur et à mesure"""
+
+    def __init__(self):
+        self._buffer = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._buffer.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._buffer)
+        self._buffer = []
+        return data
+
+
+def parquet_stream(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """Écrit un flux de DataFrames en Parquet, un groupe de lignes par DataFrame"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ValueError("Export Parquet indisponible : pyarrow n'est pas installé") from e
+
+    def generate() -> Iterator[bytes]:
+        sink = _ChunkSink()
+        writer = None
+        try:
+            for frame in frames:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(sink, table.schema, compression="zstd")
+                writer.write_table(table)
+                data = sink.drain()
+                if data:
+                    yield data
+        finally:
+            if writer is not None:
+                writer.close()
+        yield sink.drain()
+
+    return generate()
+
+
+def netcdf_stream(cube: ClimateCube, start_year: int, end_year: int,
+                  complevel: int = 4) -> Iterator[bytes]:
+    """Écrit la période en NetCDF4 compressé (année par année) puis diffuse le fichier"""
+    try:
+        import netCDF4
+    except ImportError as e:
+        raise ValueError("Export NetCDF indisponible : netCDF4 n'est pas installé") from e
+
+    sl = cube.time_slice(start_year, end_year)
+    n_lat, n_lon = len(cube.latitudes), len(cube.longitudes)
+
+    def generate() -> Iterator[bytes]:
+        # netCDF4 n'écrit que dans un vrai fichier : dossier temporaire hors du volume de données
+        tmp_dir = tempfile.mkdtemp(prefix="climate_export_")
+        path = Path(tmp_dir) / f"{cube.variable}.nc"
+        try:
+            with netCDF4.Dataset(path, "w", format="NETCDF4") as ds:
+                ds.title = f"{cube.variable} quotidien Sénégal {start_year}-{end_year}"
+                ds.createDimension("time", None)
+                ds.createDimension("lat", n_lat)
+                ds.createDimension("lon", n_lon)
+
+                time_var = ds.createVariable("time", "i4", ("time",))
+                time_var.units = "days since 1960-01-01"
+                time_var.calendar = "standard"
+                lat_var = ds.createVariable("lat", "f8", ("lat",))
+                lat_var.units = "degrees_north"
+                lat_var[:] = cube.latitudes
+                lon_var = ds.createVariable("lon", "f8", ("lon",))
+                lon_var.units = "degrees_east"
+                lon_var[:] = cube.longitudes
+
+                values_var = ds.createVariable(
+                    cube.variable, "f4", ("time", "lat", "lon"),
+                    zlib=True, complevel=complevel, shuffle=True,
+                    chunksizes=(min(366, max(sl.stop - sl.start, 1)), n_lat, n_lon),
+                    fill_value=np.float32(np.nan)
+                )
+                values_var.units = "degC"
+
+                # Écriture année par année : mémoire bornée
+                epoch = np.datetime64("1960-01-01", "D")
+                written = 0
+                for year in cube.available_years:
+                    if year < start_year or year > end_year:
+                        continue
+                    year_sl = cube.time_slice(year, year)
+                    n_days = year_sl.stop - year_sl.start
+                    time_var[written:written + n_days] = (cube.times[year_sl] - epoch).astype(np.int32)
+                    values_var[written:written + n_days] = np.asarray(cube.values[year_sl])
+                    written += n_days
+
+            with open(path, "rb") as f:
+                while True:
+                    data = f.read(READ_CHUNK_BYTES)
+                    if not data:
+                        break
+                    yield data
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return generate()
@@ -0,0 +1,164 @@
+"""
+Indices d'extrêmes de température ETCCDI, par point de grille et par année.
+
+- TXx, TNn     : maximum annuel de TX, minimum annuel de TN
+- SU, TR       : jours d'été (TX > 25 °C), nuits tropicales (TN > 20 °C)
+- TX90p, TN10p : pourcentage de jours au-delà du 90e centile de TX / en deçà du 10e centile de TN
+- WSDI, CSDI   : jours appartenant à une vague d'au moins 6 jours chauds (TX > 90e centile)
+                 ou froids (TN < 10e centile)
+- DTR          : amplitude thermique diurne moyenne (TX - TN)
+
+Les centiles sont calculés une fois par jour calendaire sur la période de
+base, dans une fenêtre de 5 jours centrée (le 29 février partage le seuil du
+28). Sans rééchantillonnage bootstrap des années de base, les pourcentages de
+ces années sont légèrement biaisés, comme dans la plupart des mises en œuvre
+opérationnelles. Les indices sont réduits le long de l'axe temps (reduceat sur
+les débuts d'années), quelques années à la fois pour borner la mémoire.
+"""
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Tuple
+
+import numpy as np
+
+from .climate_cube import ClimateCube, calendar_days
+from .spells import spell_statistics
+
+
+class IndexDefinition(NamedTuple):
+    """Description d'un indice ETCCDI"""
+    name: str
+    description: str
+    unit: str
+    variables: Tuple[str, ...]
+
+
+INDICES: Mapping[str, IndexDefinition] = MappingProxyType({
+    definition.name: definition for definition in (
+        IndexDefinition("TXx", "Maximum annuel de la température maximale journalière", "°C", ("tasmax",)),
+        IndexDefinition("TNn", "Minimum annuel de la température minimale journalière", "°C", ("tasmin",)),
+        IndexDefinition("SU", "Jours d'été : TX > 25 °C", "jours", ("tasmax",)),
+        IndexDefinition("TR", "Nuits tropicales : TN > 20 °C", "jours", ("tasmin",)),
+        IndexDefinition("TX90p", "Jours chauds : TX > 90e centile de la période de base", "%", ("tasmax",)),
+        IndexDefinition("TN10p", "Nuits froides : TN < 10e centile de la période de base", "%", ("tasmin",)),
+        IndexDefinition("WSDI", "Jours de vagues de chaleur (au moins 6 jours TX > 90e centile)", "jours", ("tasmax",)),
+        IndexDefinition("CSDI", "Jours de vagues de froid (au moins 6 jours TN < 10e centile)", "jours", ("tasmin",)),
+        IndexDefinition("DTR", "Amplitude thermique diurne moyenne (TX - TN)", "°C", ("tasmax", "tasmin")),
+    )
+})
+
+SU_THRESHOLD = 25.0
+TR_THRESHOLD = 20.0
+SPELL_MIN_DAYS = 6
+WINDOW_DAYS = 5
+
+# Jours calendaires d'une année non bissextile
+CALENDAR_DAYS = 365
+
+
+class ExtremeIndices(NamedTuple):
+    """Indices annuels (n_années, lat, lon) en float32, NaN pour les points sans données"""
+    years: np.ndarray
+    values: Dict[str, np.ndarray]
+
+
+def percentile_thresholds(cube: ClimateCube, base_start: int, base_end: int, q: float,
+                          window: int = WINDOW_DAYS, days_per_chunk: int = 73) -> np.ndarray:
+    """Centile q de chaque jour calendaire (365, lat, lon), fenêtre de `window` jours centrée"""
+    sl = cube.time_slice(base_start, base_end)
+    if sl.stop <= sl.start:
+        raise ValueError(f"Aucune donnée pour la période de base {base_start}-{base_end}")
+
+    # Jours de base rangés par (année, jour calendaire) ; jours manquants à NaN
+    years = cube.years[sl]
+    base_years, year_idx = np.unique(years, return_inverse=True)
+    cal = calendar_days(cube.times[sl])
+    by_day = np.full((len(base_years), CALENDAR_DAYS) + cube.values.shape[1:], np.nan, dtype=np.float32)
+    by_day[year_idx, cal] = cube.values[sl]
+
+    # Fenêtre circulaire : les jours de fin décembre encadrent aussi le 1er janvier
+    half = window // 2
+    thresholds = np.empty((CALENDAR_DAYS,) + cube.values.shape[1:], dtype=np.float32)
+    for start in range(0, CALENDAR_DAYS, days_per_chunk):
+        days = np.arange(start, min(start + days_per_chunk, CALENDAR_DAYS))
+        offsets = (days[None, :] + np.arange(-half, half + 1)[:, None]) % CALENDAR_DAYS
+        samples = by_day[:, offsets]  # (années, fenêtre, jours, lat, lon)
+        thresholds[days] = _nan_percentile(samples.reshape((-1,) + samples.shape[2:]), q)
+    return thresholds
+
+
+def _nan_percentile(samples: np.ndarray, q: float) -> np.ndarray:
+    """Centile q le long de l'axe 0 en ignorant les NaN (interpolation linéaire, comme np.percentile)
+
+    Tri unique puis lecture des deux rangs encadrants : np.nanpercentile traite
+    chaque colonne séparément et est plusieurs dizaines de fois plus lent ici.
+    """
+    ordered = np.sort(samples, axis=0)  # NaN rangés en fin d'axe
+    n_valid = np.count_nonzero(~np.isnan(samples), axis=0)
+    rank = np.maximum(n_valid - 1, 0) * (q / 100.0)
+    lower = np.floor(rank).astype(np.intp)
+    upper = np.minimum(lower + 1, np.maximum(n_valid - 1, 0))
+    low = np.take_along_axis(ordered, lower[None], axis=0)[0]
+    high = np.take_along_axis(ordered, upper[None], axis=0)[0]
+    value = low + (high - low) * (rank - lower)
+    return np.where(n_valid > 0, value, np.nan).astype(np.float32)
+
+
+def compute_indices(tasmax: ClimateCube, tasmin: ClimateCube, tx90: np.ndarray, tn10: np.ndarray,
+                    years_per_chunk: int = 10) -> ExtremeIndices:
+    """Tous les indices, pour toutes les années des données, en un passage sur les cubes"""
+    if not np.array_equal(tasmax.times, tasmin.times) or tasmax.shape != tasmin.shape:
+        raise ValueError("Les cubes tasmax et tasmin n'ont pas les mêmes axes")
+
+    years = tasmax.available_years
+    cal = calendar_days(tasmax.times)
+    chunks = {name: [] for name in INDICES}
+
+    for k in range(0, len(years), years_per_chunk):
+        sl = tasmax.time_slice(years[k], years[min(k + years_per_chunk, len(years)) - 1])
+        tx = np.asarray(tasmax.values[sl])
+        tn = np.asarray(tasmin.values[sl])
+        chunk_years = tasmax.years[sl]
+        starts = np.flatnonzero(np.r_[True, chunk_years[1:] != chunk_years[:-1]])
+        for name, values in _chunk_indices(tx, tn, tx90[cal[sl]], tn10[cal[sl]], starts).items():
+            chunks[name].append(values)
+
+    return ExtremeIndices(years, {name: np.concatenate(parts).astype(np.float32)
+                                  for name, parts in chunks.items()})
+
+
+def _chunk_indices(tx: np.ndarray, tn: np.ndarray, tx90: np.ndarray, tn10: np.ndarray,
+                   starts: np.ndarray) -> Dict[str, np.ndarray]:
+    """Indices (n_années, lat, lon) d'un bloc de jours commençant aux débuts d'années `starts`"""
+    def count(mask):
+        return np.add.reduceat(mask, starts, axis=0, dtype=np.int64)
+
+    def ratio(numerator, denominator, scale=1.0):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(denominator > 0, scale * numerator / denominator, np.nan)
+
+    def where_data(values, n_valid):
+        return np.where(n_valid > 0, values, np.nan)
+
+    valid_tx, valid_tn = ~np.isnan(tx), ~np.isnan(tn)
+    n_tx, n_tn = count(valid_tx), count(valid_tn)
+    # Centiles comparables uniquement là où la période de base a un seuil
+    base_tx, base_tn = valid_tx & ~np.isnan(tx90), valid_tn & ~np.isnan(tn10)
+    hot, cold = tx > tx90, tn < tn10
+    both = valid_tx & valid_tn
+
+    with np.errstate(invalid="ignore"):
+        txx = np.fmax.reduceat(tx, starts, axis=0)
+        tnn = np.fmin.reduceat(tn, starts, axis=0)
+    return {
+        "TXx": txx,
+        "TNn": tnn,
+        "SU": where_data(count(tx > SU_THRESHOLD), n_tx),
+        "TR": where_data(count(tn > TR_THRESHOLD), n_tn),
+        "TX90p": ratio(count(hot), count(base_tx), 100.0),
+        "TN10p": ratio(count(cold), count(base_tn), 100.0),
+        "WSDI": where_data(spell_statistics(hot, starts, SPELL_MIN_DAYS).total_days, n_tx),
+        "CSDI": where_data(spell_statistics(cold, starts, SPELL_MIN_DAYS).total_days, n_tn),
+        "DTR": ratio(np.add.reduceat(np.where(both, tx - tn, 0.0), starts, axis=0, dtype=np.float64),
+                     count(both)),
+    }
+
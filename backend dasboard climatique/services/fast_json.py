@@ -0,0 +1,68 @@
+"""
+Sérialisation JSON rapide des réponses, sans passer par jsonable_encoder.
+
+orjson sérialise directement les tableaux et scalaires NumPy (NaN, ±inf -> null).
+Sans orjson, repli sur le module json standard avec conversion équivalente.
+"""
+import datetime
+import json
+import math
+from typing import Any
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+
+def _default(value: Any):
+    """Types non gérés nativement : scalaires et tableaux NumPy, dates pandas, ensembles"""
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "f":
+            # Représentation la plus courte en float32 et NaN, ±inf -> null, comme orjson
+            if value.dtype.itemsize < 8:
+                value = value.astype(str).astype(np.float64)
+            converted = value.astype(object)
+            converted[~np.isfinite(value)] = None
+            return converted.tolist()
+        return value.tolist()
+    if isinstance(value, np.generic):
+        item = value.item()
+        return None if isinstance(item, float) and not math.isfinite(item) else item
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Type non sérialisable en JSON: {type(value).__name__}")
+
+
+def _finite(value: Any):
+    """Remplace les flottants Python non finis par None : json ne les passe pas à default"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def dumps(content: Any) -> bytes:
+    """Encode un résultat (dictionnaires, listes, objets NumPy) en JSON UTF-8"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(_finite(content), default=_default, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Réponse JSON sérialisée par dumps() ; à retourner directement depuis les endpoints
+    pour éviter le passage par jsonable_encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,78 @@
+"""
+Représentations compactes d'une grille régulière (lat x lon).
+
+- grid  : JSON avec les axes une seule fois et une matrice float32 ligne-majeure
+          (latitude puis longitude), null pour les points sans données (voir fast_json)
+- npy   : tableau NumPy float32 brut (NaN = sans données), axes dans les en-têtes
+- arrow : flux Arrow IPC, colonne float32 aplatie (null = sans données), axes dans
+          les métadonnées du schéma
+"""
+import io
+import json
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+NPY_MEDIA_TYPE = "application/x-npy"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+BINARY_MEDIA_TYPES = (NPY_MEDIA_TYPE, ARROW_MEDIA_TYPE)
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """Type binaire demandé dans l'en-tête Accept (None : JSON)"""
+    if not accept:
+        return None
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        if media_type.strip().lower() in BINARY_MEDIA_TYPES and "q=0" not in params.replace(" ", "").split(";"):
+            return media_type.strip().lower()
+    return None
+
+
+def grid_headers(grid: Dict) -> Dict[str, str]:
+    """En-têtes décrivant la grille pour les représentations binaires"""
+    return {
+        "X-Grid-Variable": grid["variable"],
+        "X-Grid-Unit": "degC",
+        "X-Grid-Shape": ",".join(str(n) for n in grid["values"].shape),
+        "X-Grid-Latitudes": ",".join(repr(float(v)) for v in grid["latitudes"]),
+        "X-Grid-Longitudes": ",".join(repr(float(v)) for v in grid["longitudes"]),
+    }
+
+
+def encode_npy(values: np.ndarray) -> bytes:
+    """Tableau float32 au format .npy (lisible par np.load)"""
+    buffer = io.BytesIO()
+    np.save(buffer, np.ascontiguousarray(values, dtype=np.float32), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def encode_arrow(grid: Dict) -> bytes:
+    """Flux Arrow IPC : colonne "values" aplatie ligne-majeure, axes en métadonnées"""
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ValueError("Représentation Arrow indisponible : pyarrow n'est pas installé") from e
+
+    values = np.ascontiguousarray(grid["values"], dtype=np.float32)
+    metadata = {
+        "variable": grid["variable"],
+        "unit": "degC",
+        "shape": json.dumps(list(values.shape)),
+        "latitudes": json.dumps([float(v) for v in grid["latitudes"]]),
+        "longitudes": json.dumps([float(v) for v in grid["longitudes"]]),
+    }
+    table = pa.table({"values": pa.array(values.ravel(), from_pandas=True)})
+    table = table.replace_schema_metadata(metadata)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_binary(grid: Dict, media_type: str) -> Tuple[bytes, Dict[str, str]]:
+    """Corps et en-têtes de la représentation binaire demandée"""
+    if media_type == NPY_MEDIA_TYPE:
+        return encode_npy(grid["values"]), grid_headers(grid)
+    return encode_arrow(grid), grid_headers(grid)
@@ -0,0 +1,118 @@
+"""
+Catalogue immuable des localités, construit une seule fois au démarrage.
+
+Villes de senegal_cities.csv avec leur région, leur point de grille le plus
+proche (identifiant, indices de l'API, distance) et les poids bilinéaires des
+quatre points de grille qui les entourent.
+"""
+from types import MappingProxyType
+from typing import Dict, Iterator, Mapping, NamedTuple, Optional, Tuple
+
+from .spatial_index import SpatialIndex
+
+# Région administrative de chaque ville de référence
+REGIONS: Mapping[str, str] = MappingProxyType({
+    "Dakar": "Dakar",
+    "Thiès": "Thiès",
+    "Kaolack": "Kaolack",
+    "Saint-Louis": "Saint-Louis",
+    "Ziguinchor": "Ziguinchor",
+    "Diourbel": "Diourbel",
+    "Touba": "Diourbel",
+    "Tambacounda": "Tambacounda",
+    "Kolda": "Kolda",
+    "Fatick": "Fatick",
+    "Louga": "Louga",
+    "Matam": "Matam",
+    "Kaffrine": "Kaffrine",
+    "Kédougou": "Kédougou",
+    "Sédhiou": "Sédhiou",
+})
+
+CAPITAL = "Dakar"
+
+
+class GridWeight(NamedTuple):
+    """Point de grille entourant une localité et son poids bilinéaire"""
+    grid_id: str
+    lat_idx: int
+    lon_idx: int
+    weight: float
+
+
+class Locality(NamedTuple):
+    """Ville de référence rattachée à la grille"""
+    name: str
+    region: Optional[str]
+    type: str
+    latitude: float
+    longitude: float
+    lat_idx: int
+    lon_idx: int
+    grid_id: str
+    grid_latitude: float
+    grid_longitude: float
+    distance_km: float
+    grid_points: Tuple[GridWeight, ...]
+
+    def to_dict(self) -> Dict:
+        record = self._asdict()
+        record["grid_points"] = [weight._asdict() for weight in self.grid_points]
+        return record
+
+
+class LocalityCatalogue:
+    """Ensemble figé des localités, avec recherche par nom (insensible à la casse)"""
+
+    def __init__(self, localities: Tuple[Locality, ...], grid_summary: Mapping):
+        self._localities = tuple(localities)
+        self._by_name = MappingProxyType({loc.name.lower(): loc for loc in self._localities})
+        self.grid_summary = MappingProxyType(dict(grid_summary))
+
+    @classmethod
+    def from_index(cls, spatial_index: SpatialIndex, grid_summary: Mapping) -> "LocalityCatalogue":
+        """Rattache chaque ville de l'index à son plus proche point et à ses poids d'interpolation"""
+        cities = spatial_index.city_points()
+        localities = []
+        if cities:
+            corners, weights = spatial_index.bilinear_weights(
+                [city["latitude"] for city in cities], [city["longitude"] for city in cities]
+            )
+            n_lon = len(spatial_index.longitudes)
+            for city, city_corners, city_weights in zip(cities, corners, weights):
+                grid_points = tuple(
+                    GridWeight(spatial_index.describe_point(vertex // n_lon, vertex % n_lon)["grid_id"],
+                               int(vertex // n_lon), int(vertex % n_lon), float(weight))
+                    for vertex, weight in zip(city_corners, city_weights) if weight > 0
+                )
+                localities.append(Locality(
+                    name=city["name"],
+                    region=REGIONS.get(city["name"]),
+                    type="Capitale" if city["name"] == CAPITAL else "Ville",
+                    latitude=city["latitude"],
+                    longitude=city["longitude"],
+                    lat_idx=city["lat_idx"],
+                    lon_idx=city["lon_idx"],
+                    grid_id=city["grid_id"],
+                    grid_latitude=city["grid_latitude"],
+                    grid_longitude=city["grid_longitude"],
+                    distance_km=city["distance_km"],
+                    grid_points=grid_points,
+                ))
+        return cls(tuple(localities), grid_summary)
+
+    def __iter__(self) -> Iterator[Locality]:
+        return iter(self._localities)
+
+    def __len__(self) -> int:
+        return len(self._localities)
+
+    def get(self, name: str) -> Optional[Locality]:
+        return self._by_name.get(name.strip().lower())
+
+    def to_dict(self) -> Dict:
+        """Représentation de la réponse /localities"""
+        return {
+            "cities": [loc.to_dict() for loc in self._localities],
+            "grid_summary": dict(self.grid_summary),
+        }
@@ -0,0 +1,86 @@
+import numpy as np
+from typing import Dict, Tuple
+
+from .climate_cube import ClimateCube
+
+
+class LocalityIndex:
+    """Données triées par (lat_idx, lon_idx, temps) avec index de décalages
+
+    Chaque point de grille occupe une plage contiguë de lignes ; à l'intérieur,
+    les décalages par année délimitent la période demandée. Une requête de
+    localité est donc une simple tranche, sans parcours des autres points.
+    """
+
+    # Tableaux persistés dans le magasin binaire
+    ARRAYS = ("series", "times", "years", "year_offsets")
+
+    def __init__(self, series: np.ndarray, times: np.ndarray, years: np.ndarray,
+                 year_offsets: np.ndarray, n_lon: int):
+        # series : (n_points, n_jours), point p = lat_idx * n_lon + lon_idx
+        # year_offsets : (n_années + 1,) début de chaque année dans la plage d'un point
+        self.series = series
+        self.times = np.asarray(times, dtype="datetime64[D]")
+        self.years = np.asarray(years)
+        self.year_offsets = np.asarray(year_offsets)
+        self.n_lon = n_lon
+        self.n_days = series.shape[1]
+
+    @classmethod
+    def from_cube(cls, cube: ClimateCube) -> "LocalityIndex":
+        """Transpose le cube en disposition point-majeure (une seule fois, à la construction)"""
+        n_days = cube.shape[0]
+        series = np.ascontiguousarray(np.asarray(cube.values).reshape(n_days, -1).T)
+        years = cube.available_years
+        year_offsets = np.append(np.searchsorted(cube.years, years), n_days)
+        return cls(series, cube.times, years, year_offsets, len(cube.longitudes))
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], n_lon: int) -> "LocalityIndex":
+        return cls(*(arrays[name] for name in cls.ARRAYS), n_lon=n_lon)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    def year_range(self, start_year: int, end_year: int) -> Tuple[int, int]:
+        """Décalages [début, fin) de la période à l'intérieur de la plage d'un point"""
+        i0 = int(np.searchsorted(self.years, start_year, side="left"))
+        i1 = int(np.searchsorted(self.years, end_year, side="right"))
+        return int(self.year_offsets[i0]), int(self.year_offsets[max(i0, i1)])
+
+    def point_series(self, lat_idx: int, lon_idx: int, start_year: int,
+                     end_year: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Série journalière contiguë d'un point de grille : (dates, valeurs)"""
+        o0, o1 = self.year_range(start_year, end_year)
+        return self.times[o0:o1], self.series[lat_idx * self.n_lon + lon_idx, o0:o1]
+
+    def annual_means(self, lat_idx: int, lon_idx: int, start_year: int,
+                     end_year: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Moyennes annuelles d'un point de grille : (années, moyennes, jours valides)"""
+        i0 = int(np.searchsorted(self.years, start_year, side="left"))
+        i1 = max(i0, int(np.searchsorted(self.years, end_year, side="right")))
+        o0, o1 = self.year_range(start_year, end_year)
+        values = self.series[lat_idx * self.n_lon + lon_idx, o0:o1]
+        means, counts = _period_means(values, self.year_offsets[i0:i1] - o0)
+        return self.years[i0:i1], means, counts
+
+    def monthly_means(self, lat_idx: int, lon_idx: int, start_year: int,
+                      end_year: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Moyennes mensuelles d'un point de grille : (mois datetime64[M], moyennes, jours valides)"""
+        times, values = self.point_series(lat_idx, lon_idx, start_year, end_year)
+        months = times.astype("datetime64[M]")
+        starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]]) if len(months) else np.array([], dtype=np.intp)
+        means, counts = _period_means(values, starts)
+        return months[starts], means, counts
+
+
+def _period_means(values: np.ndarray, starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Moyennes (NaN ignorés) et effectifs de tranches contiguës commençant aux indices `starts`"""
+    if len(starts) == 0:
+        return np.array([], dtype=np.float64), np.array([], dtype=np.int64)
+    valid = ~np.isnan(values)
+    sums = np.add.reduceat(np.where(valid, values, 0.0).astype(np.float64), starts)
+    counts = np.add.reduceat(valid.astype(np.int64), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts > 0, sums / counts, np.nan)
+    return means, counts
@@ -0,0 +1,124 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+def _canonical(value):
+    """Conversion JSON déterministe des types NumPy et des ensembles"""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
+
+
+def estimate_size(obj: Any) -> int:
+    """Estimation (en octets) de la mémoire occupée par un résultat"""
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + 112
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+class ResultCache:
+    """Cache LRU des résultats calculés, borné en octets, avec expiration et statistiques"""
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024, ttl: float = 3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # clé -> (valeur, taille, horodatage)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """Configuration par variables d'environnement (CLIMATE_CACHE_MAX_MB, CLIMATE_CACHE_TTL)"""
+        max_mb = float(os.getenv("CLIMATE_CACHE_MAX_MB", "128"))
+        ttl = float(os.getenv("CLIMATE_CACHE_TTL", "3600"))
+        return cls(max_bytes=int(max_mb * 1024 * 1024), ttl=ttl)
+
+    @staticmethod
+    def make_key(method: str, *args) -> str:
+        """Clé canonique, identique d'un processus à l'autre (contrairement à hash())"""
+        return json.dumps([method, list(args)], sort_keys=True, separators=(",", ":"),
+                          ensure_ascii=False, default=_canonical)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retourne la valeur en cache (None si absente ou expirée)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            value, size, timestamp = entry
+            if time.monotonic() - timestamp >= self.ttl:
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        """Met en cache une valeur en évinçant les entrées les moins récemment utilisées"""
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            # Un résultat plus gros que tout le budget n'est pas mis en cache
+            if size > self.max_bytes:
+                return
+
+            while self._size + size > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+            self._entries[key] = (value, size, time.monotonic())
+            self._size += size
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict:
+        """Statistiques d'utilisation du cache (propres au processus courant)"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else None,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "pid": os.getpid(),
+            }
@@ -0,0 +1,220 @@
+"""
+Index spatial de la grille régulière et des villes du Sénégal.
+
+Construit une seule fois à partir de senegal_grid_points.csv et
+senegal_cities.csv, aligné sur les axes (croissants) des cubes : les indices
+lat_idx / lon_idx retournés sont ceux de l'API (0 = latitude la plus au sud),
+pas ceux des CSV (0 = latitude la plus au nord). Toutes les distances sont
+des distances orthodromiques (haversine), calculées de façon vectorisée.
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+
+GRID_POINTS_CSV = "senegal_grid_points.csv"
+CITIES_CSV = "senegal_cities.csv"
+
+
+def normalize_longitude(lon):
+    """Longitudes ramenées dans [-180, 180) (la grille source est en 0-360)"""
+    lon = np.asarray(lon, dtype=np.float64)
+    # Valeurs déjà dans l'intervalle conservées telles quelles (pas d'erreur d'arrondi)
+    return np.where((lon >= -180.0) & (lon < 180.0), lon, (lon + 180.0) % 360.0 - 180.0)
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Distance orthodromique (km) entre points, avec diffusion NumPy des dimensions"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _axis_index(axis: np.ndarray, values: np.ndarray, tolerance: float = 1e-6) -> np.ndarray:
+    """Position de chaque valeur sur un axe trié (-1 si absente)"""
+    pos = np.clip(np.searchsorted(axis, values), 1, len(axis) - 1)
+    pos = np.where(np.abs(axis[pos - 1] - values) <= np.abs(axis[pos] - values), pos - 1, pos)
+    return np.where(np.abs(axis[pos] - values) <= tolerance, pos, -1)
+
+
+class SpatialIndex:
+    """Recherche du plus proche point de grille, des points dans un rayon et des villes
+
+    Sur une grille régulière, le point le plus proche d'une coordonnée est l'un
+    des quatre sommets de la cellule qui la contient : une recherche dichotomique
+    par axe puis une distance haversine sur quatre candidats suffisent, pour
+    un lot de coordonnées à la fois.
+    """
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray,
+                 grid_ids: np.ndarray, cities: pd.DataFrame):
+        # Axes des cubes (croissants) ; longitudes normalisées triées pour la recherche
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = normalize_longitude(longitudes)
+        self._lon_order = np.argsort(self.longitudes, kind="stable")
+        self._sorted_lons = self.longitudes[self._lon_order]
+
+        # Identifiants des points, indexés par (lat_idx, lon_idx) de l'API ; "" si absents du CSV
+        self.grid_ids = grid_ids
+
+        # Coordonnées de tous les points, ordre point = lat_idx * n_lon + lon_idx
+        self.point_lats = np.repeat(self.latitudes, len(self.longitudes))
+        self.point_lons = np.tile(self.longitudes, len(self.latitudes))
+
+        self.cities = cities
+
+    @classmethod
+    def from_csv(cls, data_dir: Path, latitudes: np.ndarray, longitudes: np.ndarray) -> "SpatialIndex":
+        """Construit l'index depuis les CSV de référence, alignés sur les axes des cubes"""
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        lon_axis = normalize_longitude(longitudes)
+        grid_ids = np.full((len(latitudes), len(lon_axis)), "", dtype=object)
+
+        grid_csv = Path(data_dir) / GRID_POINTS_CSV
+        if grid_csv.exists():
+            points = pd.read_csv(grid_csv)
+            # Correspondance par coordonnées : les indices des CSV sont décroissants en latitude
+            lat_idx = _axis_index(latitudes, points["latitude"].to_numpy(np.float64))
+            lon_idx = _axis_index(np.sort(lon_axis), normalize_longitude(points["longitude"].to_numpy()))
+            lon_idx = np.where(lon_idx >= 0, np.argsort(lon_axis, kind="stable")[lon_idx], -1)
+            found = (lat_idx >= 0) & (lon_idx >= 0)
+            grid_ids[lat_idx[found], lon_idx[found]] = points["grid_id"].to_numpy()[found]
+
+        cities = pd.DataFrame(columns=["name", "latitude", "longitude"])
+        cities_csv = Path(data_dir) / CITIES_CSV
+        if cities_csv.exists():
+            raw = pd.read_csv(cities_csv)
+            cities = pd.DataFrame({
+                "name": raw["city"].astype(str),
+                "latitude": raw["city_lat"].astype(np.float64),
+                "longitude": normalize_longitude(raw["city_lon"]),
+            })
+
+        return cls(latitudes, longitudes, grid_ids, cities)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.latitudes), len(self.longitudes)
+
+    def _bracket(self, axis: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices des deux sommets d'axe encadrant chaque valeur (bornés aux extrémités)"""
+        upper = np.clip(np.searchsorted(axis, values), 0, len(axis) - 1)
+        lower = np.clip(upper - 1, 0, len(axis) - 1)
+        return lower, upper
+
+    def nearest(self, lats, lons) -> Dict[str, np.ndarray]:
+        """Plus proche point de grille de chaque coordonnée (lots de coordonnées)"""
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lons = normalize_longitude(np.atleast_1d(lons))
+
+        lat_lo, lat_hi = self._bracket(self.latitudes, lats)
+        lon_lo, lon_hi = self._bracket(self._sorted_lons, lons)
+
+        # Quatre candidats par coordonnée : (n, 4)
+        cand_lat = np.stack([lat_lo, lat_lo, lat_hi, lat_hi], axis=1)
+        cand_lon = self._lon_order[np.stack([lon_lo, lon_hi, lon_lo, lon_hi], axis=1)]
+        distances = haversine_km(lats[:, None], lons[:, None],
+                                 self.latitudes[cand_lat], self.longitudes[cand_lon])
+
+        best = np.argmin(distances, axis=1)
+        rows = np.arange(len(lats))
+        return {
+            "lat_idx": cand_lat[rows, best],
+            "lon_idx": cand_lon[rows, best],
+            "distance_km": distances[rows, best],
+        }
+
+    def bilinear_weights(self, lats, lons) -> Tuple[np.ndarray, np.ndarray]:
+        """Sommets (n, 4) de la cellule englobant chaque coordonnée et poids bilinéaires (n, 4)
+
+        Les sommets sont des indices de point (lat_idx * n_lon + lon_idx) ; les
+        poids d'une coordonnée sont positifs et de somme 1.
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lons = normalize_longitude(np.atleast_1d(lons))
+        outside = ((lats < self.latitudes[0]) | (lats > self.latitudes[-1])
+                   | (lons < self._sorted_lons[0]) | (lons > self._sorted_lons[-1]))
+        if outside.any():
+            k = int(np.flatnonzero(outside)[0])
+            raise ValueError(f"Coordonnées hors de la grille: ({lats[k]}, {lons[k]})")
+
+        lat_lo, lat_hi = self._bracket(self.latitudes, lats)
+        slon_lo, slon_hi = self._bracket(self._sorted_lons, lons)
+        t = self._fraction(self.latitudes, lat_lo, lat_hi, lats)
+        u = self._fraction(self._sorted_lons, slon_lo, slon_hi, lons)
+        lon_lo, lon_hi = self._lon_order[slon_lo], self._lon_order[slon_hi]
+
+        n_lon = len(self.longitudes)
+        corners = np.stack([lat_lo * n_lon + lon_lo, lat_lo * n_lon + lon_hi,
+                            lat_hi * n_lon + lon_lo, lat_hi * n_lon + lon_hi], axis=1)
+        weights = np.stack([(1 - t) * (1 - u), (1 - t) * u, t * (1 - u), t * u], axis=1)
+        return corners, weights
+
+    @staticmethod
+    def _fraction(axis: np.ndarray, lower: np.ndarray, upper: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Position relative (0 à 1) de chaque valeur entre ses deux sommets d'axe"""
+        span = axis[upper] - axis[lower]
+        return np.divide(values - axis[lower], span, out=np.zeros_like(values), where=span > 0)
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> Dict[str, np.ndarray]:
+        """Points de grille à moins de radius_km, triés par distance croissante"""
+        distances = haversine_km(lat, normalize_longitude(lon), self.point_lats, self.point_lons)
+        points = np.flatnonzero(distances <= radius_km)
+        points = points[np.argsort(distances[points], kind="stable")]
+        n_lon = len(self.longitudes)
+        return {
+            "lat_idx": points // n_lon,
+            "lon_idx": points % n_lon,
+            "distance_km": distances[points],
+        }
+
+    def describe_point(self, lat_idx: int, lon_idx: int) -> Dict:
+        """Coordonnées et identifiant d'un point de grille"""
+        return {
+            # Convention des CSV (lat_idx décroissant) si le point n'y figure pas
+            "grid_id": self.grid_ids[lat_idx, lon_idx] or f"P_{len(self.latitudes) - 1 - lat_idx:02d}_{lon_idx:02d}",
+            "lat_idx": int(lat_idx),
+            "lon_idx": int(lon_idx),
+            "lat": float(self.latitudes[lat_idx]),
+            "lon": float(self.longitudes[lon_idx]),
+        }
+
+    def grid_points(self) -> List[Dict]:
+        """Tous les points de grille, dans l'ordre (lat_idx, lon_idx)"""
+        n_lat, n_lon = self.shape
+        return [self.describe_point(i, j) for i in range(n_lat) for j in range(n_lon)]
+
+    def city_points(self) -> List[Dict]:
+        """Villes de référence avec leur point de grille le plus proche"""
+        if self.cities.empty:
+            return []
+        match = self.nearest(self.cities["latitude"].to_numpy(), self.cities["longitude"].to_numpy())
+        cities = []
+        for k, city in enumerate(self.cities.itertuples(index=False)):
+            point = self.describe_point(match["lat_idx"][k], match["lon_idx"][k])
+            cities.append({
+                "name": city.name,
+                "latitude": float(city.latitude),
+                "longitude": float(city.longitude),
+                "lat_idx": point["lat_idx"],
+                "lon_idx": point["lon_idx"],
+                "grid_id": point["grid_id"],
+                "grid_latitude": point["lat"],
+                "grid_longitude": point["lon"],
+                "distance_km": float(match["distance_km"][k]),
+            })
+        return cities
+
+    def find(self, lat: float, lon: float, tolerance: float) -> Optional[Dict]:
+        """Point de grille le plus proche s'il est à moins de `tolerance` degrés sur chaque axe"""
+        match = self.nearest(lat, lon)
+        lat_idx, lon_idx = int(match["lat_idx"][0]), int(match["lon_idx"][0])
+        point = self.describe_point(lat_idx, lon_idx)
+        if (abs(point["lat"] - lat) > tolerance
+                or abs(point["lon"] - float(normalize_longitude(lon))) > tolerance):
+            return None
+        return {**point, "distance_km": float(match["distance_km"][0])}
@@ -0,0 +1,171 @@
+"""
+Détection des séquences de jours consécutifs (vagues de chaleur) par point de grille.
+
+Une séquence est une suite d'au moins `min_days` jours où la condition est
+vraie, coupée aux changements d'année : elle compte pour l'année de chacun
+de ses jours. Pour chaque point et chaque année : nombre de séquences, durée
+maximale et nombre total de jours en séquence.
+
+Deux noyaux équivalents :
+- NumPy : encodage par plages (run-length) vectorisé sur tout le bloc de jours
+- numba (optionnel) : boucle compilée, sans tableaux intermédiaires
+CLIMATE_SPELLS_JIT=0 force le noyau NumPy même si numba est installé.
+
+La compilation (environ 1 s) est mise en cache sur disque (cache=True) et
+faite par warm_up() dans le processus maître gunicorn avant le fork : les
+workers héritent du noyau compilé au lieu de le compiler à leur première requête.
+"""
+import os
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+from .climate_cube import ClimateCube, calendar_days
+
+try:
+    import numba
+except ImportError:  # dépendance optionnelle : noyau NumPy
+    numba = None
+
+THRESHOLD_TYPES = ("absolute", "percentile")
+
+# Durée minimale usuelle d'une vague de chaleur opérationnelle
+DEFAULT_MIN_DAYS = 3
+
+
+class SpellStats(NamedTuple):
+    """Statistiques (n_années, ...) des séquences : nombre, durée maximale, jours en séquence"""
+    count: np.ndarray
+    max_duration: np.ndarray
+    total_days: np.ndarray
+
+
+class SpellTable(NamedTuple):
+    """Statistiques annuelles (n_années, lat, lon) en float32, NaN pour les points sans données"""
+    years: np.ndarray
+    count: np.ndarray
+    max_duration: np.ndarray
+    total_days: np.ndarray
+
+
+def run_lengths(mask: np.ndarray, starts: np.ndarray):
+    """Plages de jours vrais (point, premier jour, longueur), coupées aux débuts d'années `starts`
+
+    mask : (jours, points) ; les plages sont ordonnées par point puis par jour.
+    """
+    n_days = mask.shape[0]
+    boundary = np.zeros(n_days, dtype=bool)
+    boundary[starts] = True
+
+    previous = np.zeros_like(mask)
+    previous[1:] = mask[:-1]
+    previous[boundary] = False
+    following = np.zeros_like(mask)
+    following[:-1] = mask[1:]
+    following[np.r_[starts[1:] - 1, n_days - 1]] = False
+
+    # np.nonzero sur la transposée : ordre (point, jour), débuts et fins alignés
+    cell, first = np.nonzero((mask & ~previous).T)
+    _, last = np.nonzero((mask & ~following).T)
+    return cell, first, last - first + 1
+
+
+def _numpy_spells(mask: np.ndarray, starts: np.ndarray, min_days: int) -> np.ndarray:
+    cell, first, length = run_lengths(mask, starts)
+    keep = length >= min_days
+    n_cells = mask.shape[1]
+    key = (np.searchsorted(starts, first[keep], side="right") - 1) * n_cells + cell[keep]
+    size = len(starts) * n_cells
+
+    stats = np.zeros((3, size), dtype=np.int64)
+    stats[0] = np.bincount(key, minlength=size)
+    np.maximum.at(stats[1], key, length[keep])
+    stats[2] = np.bincount(key, weights=length[keep], minlength=size).astype(np.int64)
+    return stats.reshape(3, len(starts), n_cells)
+
+
+def _loop_spells(mask: np.ndarray, starts: np.ndarray, min_days: int) -> np.ndarray:
+    """Noyau en boucles explicites, compilé par numba (jour par jour, tous les points)"""
+    n_days, n_cells = mask.shape
+    n_years = starts.shape[0]
+    stats = np.zeros((3, n_years, n_cells), dtype=np.int64)
+    run = np.zeros(n_cells, dtype=np.int64)
+    for y in range(n_years):
+        stop = starts[y + 1] if y + 1 < n_years else n_days
+        run[:] = 0
+        for t in range(starts[y], stop + 1):
+            for c in range(n_cells):
+                if t < stop and mask[t, c]:
+                    run[c] += 1
+                elif run[c] > 0:
+                    if run[c] >= min_days:
+                        stats[0, y, c] += 1
+                        stats[2, y, c] += run[c]
+                        if run[c] > stats[1, y, c]:
+                            stats[1, y, c] = run[c]
+                    run[c] = 0
+    return stats
+
+
+_jit_spells = numba.njit(nogil=True, cache=True)(_loop_spells) if numba is not None else None
+
+
+def use_jit() -> bool:
+    """Noyau compilé disponible et non désactivé (CLIMATE_SPELLS_JIT=0)"""
+    return _jit_spells is not None and os.getenv("CLIMATE_SPELLS_JIT", "1") != "0"
+
+
+def warm_up() -> bool:
+    """Compile le noyau numba sur un bloc minuscule (mêmes types que les vrais appels)"""
+    if not use_jit():
+        return False
+    spell_statistics(np.zeros((2, 1), dtype=bool), np.zeros(1, dtype=np.int64))
+    return True
+
+
+def spell_statistics(mask: np.ndarray, starts: np.ndarray, min_days: int = DEFAULT_MIN_DAYS,
+                     jit: Optional[bool] = None) -> SpellStats:
+    """Séquences d'au moins `min_days` jours vrais, par année, pour un bloc de jours
+
+    mask : (jours, ...) booléen ; starts : indices des débuts d'années du bloc.
+    Retourne des tableaux (n_années, ...) d'entiers.
+    """
+    if min_days < 1:
+        raise ValueError("La durée minimale d'une séquence doit être d'au moins 1 jour")
+    n_days = mask.shape[0]
+    cells = np.ascontiguousarray(mask.reshape(n_days, -1), dtype=bool)
+    starts = np.asarray(starts, dtype=np.int64)
+    if jit is None:
+        jit = use_jit()
+    stats = _jit_spells(cells, starts, min_days) if jit and _jit_spells is not None \
+        else _numpy_spells(cells, starts, min_days)
+    shape = (len(starts),) + mask.shape[1:]
+    return SpellStats(*(values.reshape(shape) for values in stats))
+
+
+def compute_spells(cube: ClimateCube, threshold: Union[float, np.ndarray],
+                   min_days: int = DEFAULT_MIN_DAYS, years_per_chunk: int = 10) -> SpellTable:
+    """Séquences de jours au-dessus d'un seuil, pour toutes les années et tous les points
+
+    threshold : valeur absolue (°C) ou seuils par jour calendaire (365, lat, lon),
+    par exemple un centile de la période de base (extreme_indices.percentile_thresholds).
+    """
+    per_day = np.ndim(threshold) > 0
+    cal = calendar_days(cube.times) if per_day else None
+    years = cube.available_years
+    parts = []
+
+    for k in range(0, len(years), years_per_chunk):
+        sl = cube.time_slice(years[k], years[min(k + years_per_chunk, len(years)) - 1])
+        values = np.asarray(cube.values[sl])
+        chunk_years = cube.years[sl]
+        starts = np.flatnonzero(np.r_[True, chunk_years[1:] != chunk_years[:-1]])
+        limit = threshold[cal[sl]] if per_day else threshold
+        with np.errstate(invalid="ignore"):
+            stats = spell_statistics(values > limit, starts, min_days)
+        # Points sans données (ou sans seuil) dans l'année : NaN plutôt que 0
+        valid = ~np.isnan(values) & ~np.isnan(limit)
+        has_data = np.add.reduceat(valid, starts, axis=0) > 0
+        parts.append([np.where(has_data, stat, np.nan) for stat in stats])
+
+    return SpellTable(years, *(np.concatenate(column).astype(np.float32) for column in zip(*parts)))
@@ -0,0 +1,100 @@
+"""
+Tendances linéaires (moindres carrés) de chaque point de grille, en un passage.
+
+Les moyennes annuelles viennent de l'index d'agrégats, désaisonnalisées par
+la climatologie mensuelle de la période : une année incomplète (début ou fin
+des données) ne biaise pas la pente. La régression est résolue en forme close
+sur tout le cube (années, lat, lon), les années sans données étant masquées.
+"""
+import math
+from statistics import NormalDist
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .aggregate_index import AggregateIndex
+from .anomalies import daily_anomaly_mean
+
+# Années nécessaires pour estimer une pente et son erreur type (1 degré de liberté)
+MIN_YEARS = 3
+
+
+def t_critical(df: np.ndarray, alpha: float = 0.05) -> np.ndarray:
+    """Quantile bilatéral 1 - alpha/2 de la loi de Student, sans dépendre de SciPy
+
+    Valeurs exactes jusqu'à 4 degrés de liberté (formes closes, Newton pour 3),
+    développement de Cornish-Fisher au-delà : erreur relative d'environ 1e-4 à
+    5 degrés de liberté pour alpha = 0.05 (1e-3 pour alpha = 0.01), décroissante ensuite.
+    """
+    p = 1 - alpha / 2
+    z = NormalDist().inv_cdf(p)
+    df = np.asarray(df, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        critical = _cornish_fisher(z, df)
+    for k, exact in enumerate(_small_df_quantiles(p, z), start=1):
+        critical = np.where(df == k, exact, critical)
+    return critical
+
+
+def _cornish_fisher(z: float, df):
+    g1 = (z ** 3 + z) / 4
+    g2 = (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96
+    g3 = (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384
+    g4 = (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / 92160
+    return z + g1 / df + g2 / df ** 2 + g3 / df ** 3 + g4 / df ** 4
+
+
+def _small_df_quantiles(p: float, z: float) -> Tuple[float, float, float, float]:
+    """Quantiles exacts p (p > 1/2) de la loi de Student à 1, 2, 3 et 4 degrés de liberté"""
+    t1 = math.tan(math.pi * (p - 0.5))
+    t2 = (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    a = 4 * p * (1 - p)
+    t4 = 2 * math.sqrt(math.cos(math.acos(math.sqrt(a)) / 3) / math.sqrt(a) - 1)
+
+    # 3 degrés de liberté : pas de forme close, Newton sur la fonction de répartition exacte
+    t3 = _cornish_fisher(z, 3.0)
+    for _ in range(20):
+        theta = math.atan(t3 / math.sqrt(3))
+        cdf = 0.5 + (theta + math.sin(theta) * math.cos(theta)) / math.pi
+        pdf = 6 * math.sqrt(3) / (math.pi * (3 + t3 * t3) ** 2)
+        step = (cdf - p) / pdf
+        t3 -= step
+        if abs(step) < 1e-12 * t3:
+            break
+    return t1, t2, t3, t4
+
+
+def linear_trends(aggregates: AggregateIndex, start_year: int, end_year: int,
+                  alpha: float = 0.05) -> Dict[str, np.ndarray]:
+    """Pente (°C/an), erreur type, effectif et significativité (lat, lon) sur la période"""
+    years, sums, counts = aggregates.monthly_grid_totals(start_year, end_year)
+    if len(years) < MIN_YEARS:
+        raise ValueError(f"Au moins {MIN_YEARS} années de données sont nécessaires pour une tendance")
+
+    # Moyennes annuelles désaisonnalisées (n, lat, lon)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        climatology = np.where(counts.sum(axis=0) > 0, sums.sum(axis=0) / counts.sum(axis=0), np.nan)
+    y = daily_anomaly_mean(sums, counts, climatology, axis=1)
+
+    valid = ~np.isnan(y)
+    n = valid.sum(axis=0)
+    x = np.where(valid, (years - years.mean())[:, None, None], 0.0)
+    y = np.where(valid, y, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = x.sum(axis=0) / n
+        y_mean = y.sum(axis=0) / n
+        dx = np.where(valid, x - x_mean, 0.0)
+        dy = np.where(valid, y - y_mean, 0.0)
+        sxx = (dx * dx).sum(axis=0)
+        slope = (dx * dy).sum(axis=0) / sxx
+        residuals = np.where(valid, dy - slope * dx, 0.0)
+        stderr = np.sqrt((residuals * residuals).sum(axis=0) / (n - 2) / sxx)
+        t_stat = np.abs(slope) / stderr
+
+    enough = (n >= MIN_YEARS) & (sxx > 0)
+    slope = np.where(enough, slope, np.nan)
+    stderr = np.where(enough, stderr, np.nan)
+    # Pente exacte (résidus nuls) : significative dès qu'elle n'est pas nulle
+    significant = enough & np.where(stderr > 0, t_stat > t_critical(n - 2, alpha), slope != 0)
+    return {"slope": slope, "stderr": stderr, "years_used": n, "significant": significant}
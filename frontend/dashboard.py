@@ -6,6 +6,7 @@ from plotly.subplots import make_subplots
 import numpy as np
 import requests
 import json
+import io
 import tempfile
 import os
 import leafmap.foliumap as leafmap
@@ -132,6 +133,14 @@ st.markdown("""
 # Configuration API - Render backend
 API_BASE_URL = get_api_url()
 
+# Formats d'export proposés par l'API /download : format -> (type MIME, extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "csv.gz": ("application/gzip", "csv.gz"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "netcdf": ("application/x-netcdf", "nc"),
+}
+
 @st.cache_data(ttl=300)
 def check_api_health():
     """Vérifier si l'API backend est accessible"""
@@ -171,17 +180,17 @@ def get_fallback_localities():
         {"name": "Dakar", "latitude": 14.7167, "longitude": -17.4677, "lat_idx": 11, "lon_idx": 2, "region": "Dakar", "type": "Capitale"},
         {"name": "Thiès", "latitude": 14.7886, "longitude": -16.926, "lat_idx": 11, "lon_idx": 4, "region": "Thiès", "type": "Ville"},
         {"name": "Saint-Louis", "latitude": 16.0469, "longitude": -16.4814, "lat_idx": 16, "lon_idx": 6, "region": "Saint-Louis", "type": "Ville"},
-        {"name": "Kaolack", "latitude": 14.1593, "longitude": -16.0724, "lat_idx": 8, "lon_idx": 5, "region": "Kaolack", "type": "Ville"},
+        {"name": "Kaolack", "latitude": 14.1593, "longitude": -16.0724, "lat_idx": 9, "lon_idx": 8, "region": "Kaolack", "type": "Ville"},
         {"name": "Ziguinchor", "latitude": 12.5681, "longitude": -16.2736, "lat_idx": 2, "lon_idx": 7, "region": "Ziguinchor", "type": "Ville"},
-        {"name": "Tambacounda", "latitude": 13.7671, "longitude": -13.6675, "lat_idx": 7, "lon_idx": 12, "region": "Tambacounda", "type": "Ville"},
-        {"name": "Kolda", "latitude": 12.8939, "longitude": -14.9417, "lat_idx": 3, "lon_idx": 9, "region": "Kolda", "type": "Ville"},
-        {"name": "Diourbel", "latitude": 14.6598, "longitude": -16.2353, "lat_idx": 10, "lon_idx": 6, "region": "Diourbel", "type": "Ville"},
-        {"name": "Louga", "latitude": 15.6181, "longitude": -16.2265, "lat_idx": 14, "lon_idx": 6, "region": "Louga", "type": "Ville"},
-        {"name": "Fatick", "latitude": 14.3347, "longitude": -16.4069, "lat_idx": 9, "lon_idx": 5, "region": "Fatick", "type": "Ville"},
-        {"name": "Kaffrine", "latitude": 14.1058, "longitude": -15.5503, "lat_idx": 8, "lon_idx": 8, "region": "Kaffrine", "type": "Ville"},
-        {"name": "Kédougou", "latitude": 12.5603, "longitude": -12.1750, "lat_idx": 2, "lon_idx": 15, "region": "Kédougou", "type": "Ville"},
-        {"name": "Matam", "latitude": 15.6556, "longitude": -13.2519, "lat_idx": 14, "lon_idx": 13, "region": "Matam", "type": "Ville"},
-        {"name": "Sédhiou", "latitude": 12.7081, "longitude": -15.5569, "lat_idx": 3, "lon_idx": 8, "region": "Sédhiou", "type": "Ville"},
+        {"name": "Tambacounda", "latitude": 13.7671, "longitude": -13.6675, "lat_idx": 7, "lon_idx": 17, "region": "Tambacounda", "type": "Ville"},
+        {"name": "Kolda", "latitude": 12.8939, "longitude": -14.9417, "lat_idx": 4, "lon_idx": 12, "region": "Kolda", "type": "Ville"},
+        {"name": "Diourbel", "latitude": 14.6598, "longitude": -16.2353, "lat_idx": 11, "lon_idx": 7, "region": "Diourbel", "type": "Ville"},
+        {"name": "Louga", "latitude": 15.6181, "longitude": -16.2265, "lat_idx": 14, "lon_idx": 7, "region": "Louga", "type": "Ville"},
+        {"name": "Fatick", "latitude": 14.3347, "longitude": -16.4069, "lat_idx": 9, "lon_idx": 6, "region": "Fatick", "type": "Ville"},
+        {"name": "Kaffrine", "latitude": 14.1058, "longitude": -15.5503, "lat_idx": 8, "lon_idx": 10, "region": "Kaffrine", "type": "Ville"},
+        {"name": "Kédougou", "latitude": 12.5603, "longitude": -12.1750, "lat_idx": 2, "lon_idx": 23, "region": "Kédougou", "type": "Ville"},
+        {"name": "Matam", "latitude": 15.6556, "longitude": -13.2519, "lat_idx": 15, "lon_idx": 19, "region": "Matam", "type": "Ville"},
+        {"name": "Sédhiou", "latitude": 12.7081, "longitude": -15.5569, "lat_idx": 3, "lon_idx": 10, "region": "Sédhiou", "type": "Ville"},
         {"name": "Keur Massar", "latitude": 14.7831, "longitude": -17.3239, "lat_idx": 11, "lon_idx": 3, "region": "Dakar", "type": "Ville"}
     ]
 
@@ -195,147 +204,45 @@ def get_cities_climate_data(variable, start_year, end_year):
             st.error("❌ Impossible de récupérer les localités depuis l'API")
             return []
         
-        cities_climate = []
-        
         # Vérifier la santé de l'API
         api_available = check_api_health()
         
         if not api_available:
             return []
         
-        progress_bar = st.progress(0)
-        
-        for i, city_data in enumerate(cities_from_api):
-            city_name = city_data['name']
-            lat = city_data['latitude']
-            lon = city_data['longitude']
-            lat_idx = city_data['lat_idx']
-            lon_idx = city_data['lon_idx']
-            try:
-                # Utiliser les indices de grille calculés par l'API backend
-                params = {
-                    'var': variable,  # Le backend attend 'var' pas 'variable'
-                    'start_year': start_year,
-                    'end_year': end_year,
-                    'lat_idx': lat_idx,
-                    'lon_idx': lon_idx
-                }
-                
-                response = requests.get(f"{API_BASE_URL}/download", params=params, timeout=15)
-                
-                if response.status_code == 200:
-                    # Parser les données CSV du backend
-                    csv_data = response.text
-                    
-                    if csv_data and len(csv_data.split('\n')) > 1:
-                        lines = csv_data.strip().split('\n')
-                        header = lines[0].split(',')
-                        
-                        # Trouver la colonne de température
-                        temp_col = -1
-                        for j, col in enumerate(header):
-                            if variable in col.lower():
-                                temp_col = j
-                                break
-                        
-                        if temp_col >= 0:
-                            temperatures = []
-                            for line in lines[1:]:
-                                if line.strip():
-                                    parts = line.split(',')
-                                    if len(parts) > temp_col:
-                                        try:
-                                            temp_val = float(parts[temp_col])
-                                            temperatures.append(temp_val)
-                                        except:
-                                            continue
-                            
-                            if temperatures:
-                                temp_value = float(np.mean(temperatures))
-                            else:
-                                temp_value = extract_national_data_for_city(variable, start_year, end_year, lat, lon)
-                        else:
-                            temp_value = extract_national_data_for_city(variable, start_year, end_year, lat, lon)
-                    else:
-                        temp_value = extract_national_data_for_city(variable, start_year, end_year, lat, lon)
-                else:
-                    # Fallback: ajustement des données nationales
-                    temp_value = extract_national_data_for_city(variable, start_year, end_year, lat, lon)
-                
-                cities_climate.append({
-                    'city': city_name,
-                    'lat': lat,
-                    'lon': lon,
-                    'temperature': round(temp_value, 1),
-                    'indices': (lat_idx, lon_idx)
-                })
-                
-                progress_bar.progress((i + 1) / len(cities_from_api))
-                
-            except Exception as e:
-                # Fallback: utiliser les données nationales ajustées
-                temp_value = extract_national_data_for_city(variable, start_year, end_year, lat, lon)
-                cities_climate.append({
-                    'city': city_name,
-                    'lat': lat,
-                    'lon': lon,
-                    'temperature': temp_value,
-                    'indices': (lat_idx, lon_idx)
-                })
-                progress_bar.progress((i + 1) / len(cities_from_api))
-        
-        progress_bar.empty()
-        return cities_climate
-        
-    except Exception as e:
-        return []
-
-def extract_national_data_for_city(variable, start_year, end_year, lat, lon):
-    """Extraire les vraies données CSV nationales via API - PAS D'AJUSTEMENT ARTIFICIEL"""
-    try:
+        # Une seule requête pour toutes les villes (calcul vectorisé côté backend)
         params = {
-            'var': variable,
+            'var': variable,  # Le backend attend 'var' pas 'variable'
             'start_year': start_year,
-            'end_year': end_year
+            'end_year': end_year,
+            'cities': [city['name'] for city in cities_from_api]
         }
         
-        response = requests.get(f"{API_BASE_URL}/download", params=params, timeout=15)
+        response = requests.get(f"{API_BASE_URL}/localities/batch", params=params, timeout=30)
         
-        if response.status_code == 200:
-            # Parser les données CSV du backend (données NetCDF réelles)
-            csv_data = response.text
+        if response.status_code != 200:
+            return []
+        
+        batch_by_name = {loc['name']: loc for loc in response.json().get('localities', [])}
+        
+        cities_climate = []
+        for city_data in cities_from_api:
+            locality = batch_by_name.get(city_data['name'])
+            if not locality or locality.get('mean') is None:
+                continue
             
-            if csv_data and len(csv_data.split('\n')) > 1:
-                lines = csv_data.strip().split('\n')
-                header = lines[0].split(',')
-                
-                # Trouver la colonne de température
-                temp_col = -1
-                for i, col in enumerate(header):
-                    if variable in col.lower():
-                        temp_col = i
-                        break
-                
-                if temp_col >= 0:
-                    temperatures = []
-                    for line in lines[1:]:
-                        if line.strip():
-                            parts = line.split(',')
-                            if len(parts) > temp_col:
-                                try:
-                                    temp_val = float(parts[temp_col])
-                                    temperatures.append(temp_val)
-                                except:
-                                    continue
-                    
-                    if temperatures:
-                        # Retourner la moyenne réelle sans ajustement artificiel
-                        return round(float(np.mean(temperatures)), 1)
-    
+            cities_climate.append({
+                'city': city_data['name'],
+                'lat': city_data['latitude'],
+                'lon': city_data['longitude'],
+                'temperature': round(locality['mean'], 1),
+                'indices': (locality['lat_idx'], locality['lon_idx'])
+            })
+        
+        return cities_climate
+        
     except Exception as e:
-        return None
-    
-    return None
+        return []
 
 # FONCTION SUPPRIMÉE : Plus de simulation - Utilisation exclusive des données NetCDF réelles
 
@@ -422,103 +329,52 @@ def fetch_locality_data(variable, start_year, end_year, lat_idx, lon_idx, city_n
         
 
         
-        # Méthode 1: Essayer avec les nouveaux indices calculés
+        # Méthode 1: Série annuelle calculée par l'API pour le point de grille
         try:
             params = {
                 'var': variable,  # Le backend attend 'var' pas 'variable'
                 'start_year': start_year,
                 'end_year': end_year,
                 'lat_idx': lat_idx_real,
-                'lon_idx': lon_idx_real
+                'lon_idx': lon_idx_real,
+                'frequency': 'annual'
             }
             
-            response = requests.get(f"{API_BASE_URL}/download", params=params, timeout=30)
+            response = requests.get(f"{API_BASE_URL}/localities/series", params=params, timeout=30)
             
             if response.status_code == 200:
-                # Le backend retourne du CSV, pas du JSON
-                csv_data = response.text
+                series = response.json()
+                annual = [(year, value) for year, value in zip(series['periods'], series['values']) if value is not None]
                 
-                if csv_data and len(csv_data.split('\n')) > 1:
-                    # Parser le CSV
-                    lines = csv_data.strip().split('\n')
-                    header = lines[0].split(',')
-                    
-                    # Trouver la colonne de température
-                    temp_col = -1
-                    for i, col in enumerate(header):
-                        if variable in col.lower():
-                            temp_col = i
-                            break
-                    
-                    if temp_col == -1:
-                        st.warning(f"⚠️ Colonne {variable} non trouvée dans les données")
-                        raise Exception(f"Colonne {variable} non trouvée")
-                    
-                    # Extraire les températures et dates
-                    temperatures = []
-                    years = []
+                if annual:
+                    years = [year for year, _ in annual]
+                    annual_temps = [value for _, value in annual]
+                    st.success(f"✅ {sum(series.get('counts', []))} jours NetCDF agrégés pour {city_name}")
                     
-                    for line in lines[1:]:
-                        if line.strip():
-                            parts = line.split(',')
-                            if len(parts) > temp_col:
-                                try:
-                                    temp_val = float(parts[temp_col])
-                                    temperatures.append(temp_val)
-                                    
-                                    # Extraire l'année de la date
-                                    date_str = parts[0]
-                                    year = int(date_str.split('-')[0])
-                                    if year not in years:
-                                        years.append(year)
-                                except:
-                                    continue
+                    # Calculer les statistiques réelles
+                    stats = {
+                        'mean': float(np.mean(annual_temps)),
+                        'min': float(np.min(annual_temps)),
+                        'max': float(np.max(annual_temps)),
+                        'std': float(np.std(annual_temps)),
+                        'median': float(np.median(annual_temps))
+                    }
                     
-                    if temperatures:
-                        # Calculer la moyenne annuelle
-                        annual_temps = []
-                        for year in sorted(years):
-                            year_temps = []
-                            for i, line in enumerate(lines[1:]):
-                                if line.strip():
-                                    parts = line.split(',')
-                                    if len(parts) > temp_col and parts[0].startswith(str(year)):
-                                        try:
-                                            temp_val = float(parts[temp_col])
-                                            year_temps.append(temp_val)
-                                        except:
-                                            continue
-                            
-                            if year_temps:
-                                annual_temps.append(np.mean(year_temps))
-                        
-                        if annual_temps:
-                            st.success(f"✅ {len(temperatures)} points NetCDF extraites pour {city_name}")
-                            
-                            # Calculer les statistiques réelles
-                            stats = {
-                                'mean': float(np.mean(annual_temps)),
-                                'min': float(np.min(annual_temps)),
-                                'max': float(np.max(annual_temps)),
-                                'std': float(np.std(annual_temps)),
-                                'median': float(np.median(annual_temps))
-                            }
-                            
-                            return {
-                                'years': sorted(years),
-                                'temperatures': [round(t, 1) for t in annual_temps],
-                                'monthly_climatology': [],
-                                'months': ['Jan', 'Fév', 'Mar', 'Avr', 'Mai', 'Jun', 'Jul', 'Aoû', 'Sep', 'Oct', 'Nov', 'Déc'],
-                                'stats': stats,
-                                'spatial': None,
-                                'locality_info': {
-                                    'lat_idx': lat_idx_real,
-                                    'lon_idx': lon_idx_real,
-                                    'city_name': city_name,
-                                    'coordinates': (lat, lon),
-                                    'data_source': 'netcdf_real'
-                                }
-                            }
+                    return {
+                        'years': years,
+                        'temperatures': [round(t, 1) for t in annual_temps],
+                        'monthly_climatology': [],
+                        'months': ['Jan', 'Fév', 'Mar', 'Avr', 'Mai', 'Jun', 'Jul', 'Aoû', 'Sep', 'Oct', 'Nov', 'Déc'],
+                        'stats': stats,
+                        'spatial': None,
+                        'locality_info': {
+                            'lat_idx': lat_idx_real,
+                            'lon_idx': lon_idx_real,
+                            'city_name': city_name,
+                            'coordinates': (lat, lon),
+                            'data_source': 'netcdf_real'
+                        }
+                    }
             
             st.warning(f"⚠️ Réponse API: Status {response.status_code}")
             
@@ -591,6 +447,27 @@ def fetch_locality_data(variable, start_year, end_year, lat_idx, lon_idx, city_n
     except Exception as e:
         return fetch_data(variable, start_year, end_year)
 
+@st.cache_data(ttl=300)
+def fetch_locality_daily_series(variable, start_year, end_year, lat_idx, lon_idx, points=1000):
+    """Série journalière d'un point de grille, réduite par l'API (LTTB) à environ `points` valeurs"""
+    try:
+        params = {
+            'var': variable,
+            'start_year': start_year,
+            'end_year': end_year,
+            'lat_idx': lat_idx,
+            'lon_idx': lon_idx,
+            'frequency': 'daily',
+            'points': points,
+            'method': 'lttb'
+        }
+        response = requests.get(f"{API_BASE_URL}/localities/series", params=params, timeout=30)
+        if response.status_code == 200:
+            return response.json()
+        return None
+    except Exception:
+        return None
+
 def adapt_locality_data_format(locality_data):
     """Adapter les données de localité au format attendu par les graphiques"""
     if not locality_data:
@@ -755,74 +632,30 @@ def fetch_spatial_data(variable, start_year, end_year):
         if not check_api_health():
             raise Exception("API backend indisponible")
         
-        # L'endpoint /spatial nécessite un mois, on va faire une moyenne de 6 mois représentatifs
-        representative_months = [1, 4, 7, 10]  # Jan, Avr, Jul, Oct pour représenter les saisons
-        all_spatial_data = []
+        # Moyenne de 4 mois représentatifs des saisons (Jan, Avr, Jul, Oct), agrégée côté serveur
+        params = {
+            'var': variable,
+            'months': [1, 4, 7, 10],
+            'start_year': start_year,
+            'end_year': end_year
+        }
         
-        for month in representative_months:
-            params = {
-                'var': variable,
-                'month': month,
-                'start_year': start_year,
-                'end_year': end_year
-            }
-            
-            response = requests.get(f"{API_BASE_URL}/spatial", params=params, timeout=60)
-            
-            if response.status_code == 200:
-                monthly_data = response.json()
-                all_spatial_data.append(monthly_data)
+        # Grille dense binaire (.npy float32, NaN = sans données), axes dans les en-têtes
+        response = requests.get(
+            f"{API_BASE_URL}/spatial", params=params, timeout=60,
+            headers={'Accept': 'application/x-npy'}
+        )
         
-        if all_spatial_data:
-            # Prendre les données du premier mois comme structure de base
-            base_data = all_spatial_data[0]
-            
-            # Vérifier si nous avons la structure attendue du backend
-            if 'latitudes' in base_data and 'longitudes' in base_data and 'data' in base_data:
-                latitudes = base_data['latitudes']
-                longitudes = base_data['longitudes']
-                
-                # Moyenner les données de tous les mois
-                all_data_points = []
-                for month_data in all_spatial_data:
-                    if 'data' in month_data:
-                        all_data_points.extend(month_data['data'])
-                
-                if all_data_points:
-                    # Créer un dictionnaire pour moyenner par coordonnées
-                    coord_values = {}
-                    for point in all_data_points:
-                        lat = point['latitude']
-                        lon = point['longitude']
-                        val = point.get(variable, 0)
-                        
-                        key = (lat, lon)
-                        if key not in coord_values:
-                            coord_values[key] = []
-                        coord_values[key].append(val)
-                    
-                    # Calculer les moyennes
-                    averaged_values = {}
-                    for coord, vals in coord_values.items():
-                        averaged_values[coord] = np.mean(vals)
-                    
-                    # Organiser en matrice selon les latitudes/longitudes
-                    values_matrix = []
-                    for lat in latitudes:
-                        row = []
-                        for lon in longitudes:
-                            val = averaged_values.get((lat, lon), np.nan)
-                            row.append(val)
-                        values_matrix.append(row)
-                    
-                    return {
-                        'latitudes': latitudes,
-                        'longitudes': longitudes,
-                        'values': values_matrix
-                    }
+        if response.status_code == 200:
+            if response.headers.get('content-type', '').startswith('application/x-npy'):
+                return {
+                    'latitudes': [float(v) for v in response.headers['X-Grid-Latitudes'].split(',')],
+                    'longitudes': [float(v) for v in response.headers['X-Grid-Longitudes'].split(',')],
+                    'values': np.load(io.BytesIO(response.content), allow_pickle=False)
+                }
             
-            # Si structure différente, retourner la première
-            return base_data
+            # Si structure différente, retourner la réponse telle quelle
+            return response.json()
         
         # Fallback: créer des données spatiales à partir des coordonnées du processeur
         try:
@@ -915,6 +748,31 @@ def create_time_series(variable, start_year, end_year, data):
     
     return fig
 
+def create_daily_series(variable, series):
+    """Série journalière (réduite côté serveur) d'un point de grille, zoomable"""
+    color = '#3b82f6' if variable == 'tasmin' else '#ef4444'
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=series['periods'],
+        y=series['values'],
+        mode='lines',
+        name=f'{"Température minimale" if variable == "tasmin" else "Température maximale"} journalière',
+        line=dict(color=color, width=1)
+    ))
+    
+    shown = len(series['periods'])
+    fig.update_layout(
+        title=f"Série journalière ({shown} points affichés sur {series['total_points']} jours)",
+        xaxis_title="Date",
+        yaxis_title="Température (°C)",
+        height=400,
+        margin=dict(t=50, b=50, l=50, r=50),
+        xaxis=dict(rangeslider=dict(visible=True))
+    )
+    
+    return fig
+
 def create_climatology(variable, start_year, end_year, data):
     """Climatologie moyenne"""
     if not data or not data['monthly_climatology']:
@@ -1016,7 +874,7 @@ def create_spatial_map(variable, data):
     longitudes = spatial_data.get('longitudes', [])
     values = spatial_data.get('values', [])
     
-    if not latitudes or not longitudes or not values:
+    if not len(latitudes) or not len(longitudes) or not len(values):
         fig = go.Figure()
         fig.add_annotation(
             text="❌ Données spatiales incomplètes",
@@ -1027,54 +885,41 @@ def create_spatial_map(variable, data):
         fig.update_layout(height=400)
         return fig
     
-    # Convertir longitudes de 0-360 à -180-180 pour le Sénégal
-    # Sénégal : 342° à 349° (système 0-360) = -18° à -11° (système -180-180)
-    lons_converted = [(lon - 360) for lon in longitudes]  # Conversion directe car toutes > 180
-    
-    # Créer des grilles de points (coordonnées du Sénégal)
-    lat_grid = []
-    lon_grid = []
-    temp_grid = []
-    
-    for i, lat in enumerate(latitudes):
-        for j, lon in enumerate(lons_converted):
-            # Vérifier que les coordonnées sont bien dans les limites du Sénégal
-            if 12 <= lat <= 17 and -18 <= lon <= -11:
-                lat_grid.append(lat)
-                lon_grid.append(lon)
-                if i < len(values) and j < len(values[0]) if values else False:
-                    temp_grid.append(values[i][j])
-                else:
-                    temp_grid.append(np.nan)
+    # Longitudes ramenées dans [-180, 180) (Sénégal : 342° à 349° = -18° à -11°)
+    lats = np.asarray(latitudes, dtype=float)
+    lons = (np.asarray(longitudes, dtype=float) + 180) % 360 - 180
+    temps = np.asarray(values, dtype=float)
+    
+    # Grille dense (lat x lon) : coordonnées de chaque cellule ; sinon points déjà appariés
+    if temps.ndim == 2:
+        lons, lats = np.meshgrid(lons, lats)
+    lats, lons, temps = lats.ravel(), lons.ravel(), temps.ravel()
+    
+    # Points dans les limites du Sénégal et ayant des données
+    valid = (12 <= lats) & (lats <= 17) & (-18 <= lons) & (lons <= -11) & ~np.isnan(temps)
     
     # Couleurs selon la variable
     colorscale = 'Blues' if variable == 'tasmin' else 'Reds'
     
     fig = go.Figure()
     
-    if lat_grid and lon_grid and temp_grid:
-        valid_indices = [i for i, temp in enumerate(temp_grid) if not np.isnan(temp)]
-        
-        if valid_indices:
-            lat_valid = [lat_grid[i] for i in valid_indices]
-            lon_valid = [lon_grid[i] for i in valid_indices]
-            temp_valid = [temp_grid[i] for i in valid_indices]
-            
-            fig.add_trace(go.Scattermapbox(
-                lat=lat_valid,
-                lon=lon_valid,
-                mode='markers',
-                marker=dict(
-                    size=12,
-                    color=temp_valid,
-                    colorscale=colorscale,
-                    colorbar=dict(title="°C", x=1.02),
-                    showscale=True,
-                    opacity=0.8
-                ),
-                text=[f"{temp:.1f}°C" for temp in temp_valid],
-                name='Température'
-            ))
+    if valid.any():
+        temp_valid = temps[valid]
+        fig.add_trace(go.Scattermapbox(
+            lat=lats[valid],
+            lon=lons[valid],
+            mode='markers',
+            marker=dict(
+                size=12,
+                color=temp_valid,
+                colorscale=colorscale,
+                colorbar=dict(title="°C", x=1.02),
+                showscale=True,
+                opacity=0.8
+            ),
+            text=[f"{temp:.1f}°C" for temp in temp_valid],
+            name='Température'
+        ))
     
     fig.update_layout(
         title=f"Répartition spatiale au Sénégal (Janvier) - {'Température minimale' if variable == 'tasmin' else 'Température maximale'}",
@@ -1574,7 +1419,7 @@ def create_navigation_sidebar():
         with col1:
             format_type = st.selectbox(
                 "Format",
-                options=["csv", "netcdf"],
+                options=list(EXPORT_FORMATS.keys()),
                 key="format_select",
                 label_visibility="collapsed"
             )
@@ -1584,8 +1429,8 @@ def create_navigation_sidebar():
             try:
                 data_content = download_data_from_api(variable, start_year, end_year, format_type)
                 if data_content:
-                    filename = f"{selected_locality_name.replace(' ', '_')}_{variable}_{start_year}_{end_year}.{format_type}"
-                    mime_type = "text/csv" if format_type == "csv" else "application/x-netcdf"
+                    mime_type, extension = EXPORT_FORMATS[format_type]
+                    filename = f"{selected_locality_name.replace(' ', '_')}_{variable}_{start_year}_{end_year}.{extension}"
                     
                     # Bouton de téléchargement direct en un clic
                     st.download_button(
@@ -1826,6 +1671,16 @@ def main():
     
 
     
+    # Série journalière de la localité (réduite côté serveur pour rester légère)
+    locality_info = (data or {}).get('locality_info') or {}
+    if locality_info.get('lat_idx') is not None and locality_info.get('lon_idx') is not None:
+        daily_series = fetch_locality_daily_series(
+            variable, start_year, end_year, locality_info['lat_idx'], locality_info['lon_idx']
+        )
+        if daily_series and daily_series.get('periods'):
+            st.subheader("📅 Série Journalière")
+            st.plotly_chart(create_daily_series(variable, daily_series), use_container_width=True)
+    
     # Section interactive - Graphiques détaillés pour la localité sélectionnée
     st.markdown("---")
     